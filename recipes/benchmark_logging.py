@@ -0,0 +1,139 @@
+"""Measure the per-record cost of the log record factory.
+
+Compares the stdlib default, the old ``inspect.stack()`` walk and the current
+frame walk, and disabled debug calls with eager f-strings versus lazy %-style
+arguments. Needs no Django setup::
+
+    python -m recipes.benchmark_logging --records 2000
+"""
+
+import argparse
+import inspect
+import logging
+import pathlib
+import time
+
+from recipes import logging as recipes_logging
+from recipes.logging import RecipeLogger, old_factory, record_factory
+
+# The stack walk the record factory used before, kept to compare against.
+LEGACY_ROOT_DIR = "".join(pathlib.Path(recipes_logging.__file__).parts[:2])
+
+# Stands in for library code (Django, Celery) that logs from frames outside the
+# package, some way below the package code that called it.
+EXTERNAL_SOURCE = """
+def log_from_library(log, depth, count):
+    if depth:
+        return log_from_library(log, depth - 1, count)
+    for index in range(count):
+        log("Library message %s", index)
+"""
+
+
+def legacy_record_factory(*args, **kwargs):
+    record = old_factory(*args, **kwargs)
+    try:
+        actual_calling_frame = next(
+            frameinfo
+            for frameinfo in inspect.stack()
+            if frameinfo.filename.startswith(LEGACY_ROOT_DIR)
+            and frameinfo.filename != recipes_logging.__file__
+        )
+    except StopIteration:
+        pass
+    else:
+        record.pathname = actual_calling_frame.filename
+        record.lineno = actual_calling_frame.lineno
+        record.funcName = actual_calling_frame.function
+        record.filename = pathlib.Path(actual_calling_frame.filename).parts[-1]
+        record.module = record.name.split(".")[-1]
+    return record
+
+
+class LoggingBenchmark:
+    def run(self, records: int, library_depth: int) -> None:
+        stdlib_logger = logging.getLogger("recipes.benchmark")
+        stdlib_logger.handlers = [logging.NullHandler()]
+        stdlib_logger.propagate = False
+        stdlib_logger.setLevel(logging.INFO)
+        logger = RecipeLogger(stdlib_logger)
+        namespace = {}
+        exec(compile(EXTERNAL_SOURCE, "<library>", "exec"), namespace)
+        log_from_library = namespace["log_from_library"]
+
+        factories = (
+            ("stdlib", old_factory),
+            ("inspect.stack", legacy_record_factory),
+            ("frame walk", record_factory),
+        )
+        timings = {}
+        try:
+            for label, factory in factories:
+                logging.setLogRecordFactory(factory)
+                timings[label, "package"] = self._time(
+                    lambda: self._log_from_package(logger, records), records
+                )
+                timings[label, "library"] = self._time(
+                    lambda: log_from_library(logger.info, library_depth, records),
+                    records,
+                )
+        finally:
+            logging.setLogRecordFactory(record_factory)
+
+        for caller in ("package", "library"):
+            for label, _ in factories:
+                print(
+                    f"{label:>14} factory, {caller} caller: "
+                    f"{timings[label, caller]:>9.2f} µs/record"
+                )
+            # Overhead each factory adds on top of creating the stdlib record.
+            legacy = timings["inspect.stack", caller] - timings["stdlib", caller]
+            current = max(
+                timings["frame walk", caller] - timings["stdlib", caller], 0.01
+            )
+            print(
+                f"{'':>14} overhead {legacy:,.2f} -> {current:,.2f} µs/record "
+                f"({legacy / current:,.0f}x less)"
+            )
+
+        payload = {"fdc_ids": list(range(200)), "params": {"pageSize": 200}}
+        calls = records * 50
+        eager = self._time(lambda: self._debug_eager(logger, payload, calls), calls)
+        lazy = self._time(lambda: self._debug_lazy(logger, payload, calls), calls)
+        print(f"  disabled debug, f-string: {eager:>9.3f} µs/call")
+        print(f"  disabled debug, %-style:  {lazy:>9.3f} µs/call")
+        print(f"{'':>14} f-string / %-style: {eager / lazy:,.0f}x")
+
+    def _time(self, fn, count: int) -> float:
+        started = time.perf_counter()
+        fn()
+        return (time.perf_counter() - started) / count * 1e6
+
+    def _log_from_package(self, logger: RecipeLogger, count: int) -> None:
+        for index in range(count):
+            logger.info("Package message %s", index)
+
+    def _debug_eager(self, logger: RecipeLogger, payload: dict, count: int) -> None:
+        for _ in range(count):
+            logger.debug(f"Request params: {payload}")
+
+    def _debug_lazy(self, logger: RecipeLogger, payload: dict, count: int) -> None:
+        for _ in range(count):
+            logger.debug("Request params: %s", payload)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2_000)
+    parser.add_argument(
+        "--library-depth",
+        type=int,
+        default=30,
+        help="Library frames between the package code and the logging call",
+    )
+    args = parser.parse_args(argv)
+    LoggingBenchmark().run(args.records, args.library_depth)
+
+
+if __name__ == "__main__":
+    main()
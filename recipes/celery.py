@@ -1,10 +1,17 @@
 import os
+import time
 
-from celery import Celery
-from recipes.logging import getLogger
+from celery import Celery, signals
+from recipes.logging import correlation_id, getLogger, stop_queue_logging
+from recipes.logging import task_id as current_task_id
+from recipes.metrics import flush_metrics, task_duration, task_runs
 
 logger = getLogger(__name__)
 
+# Message header carrying the correlation ID of whatever queued the task. Celery's
+# own ``correlation_id`` is always the task ID, hence the separate name.
+CORRELATION_HEADER = "log_correlation_id"
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "recipes.settings")
 logger.info("Initializing Celery application")
 app = Celery("recipes")
@@ -12,3 +19,57 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 logger.info("Loading Celery configuration from Django settings")
 app.autodiscover_tasks()
 logger.info("Celery task autodiscovery completed")
+
+# Tasks whose runs are timed and counted.
+MEASURED_TASK_PREFIX = "recipes.fdc.tasks."
+
+# (correlation, task) context tokens of the tasks running in this process.
+_task_context = {}
+# Start times of the measured tasks running in this process.
+_task_started = {}
+
+
+@signals.before_task_publish.connect
+def add_correlation_header(headers=None, **kwargs):
+    current = correlation_id.get()
+    if current and headers is not None:
+        headers.setdefault(CORRELATION_HEADER, current)
+
+
+@signals.task_prerun.connect
+def set_task_context(task_id=None, task=None, **kwargs):
+    parent = getattr(task.request, CORRELATION_HEADER, None) if task else None
+    _task_context[task_id] = (
+        correlation_id.set(parent or task_id),
+        current_task_id.set(task_id),
+    )
+    if task is not None and task.name.startswith(MEASURED_TASK_PREFIX):
+        _task_started[task_id] = time.perf_counter()
+
+
+@signals.task_postrun.connect
+def reset_task_context(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        labels = {"task": task.name.removeprefix(MEASURED_TASK_PREFIX), "state": state}
+        task_runs.inc(**labels)
+        task_duration.observe(time.perf_counter() - started, **labels)
+    tokens = _task_context.pop(task_id, None)
+    if tokens:
+        correlation_id.reset(tokens[0])
+        current_task_id.reset(tokens[1])
+
+
+@signals.setup_logging.connect
+def use_django_logging(**kwargs):
+    # Connecting this stops Celery from replacing the root logger's handlers,
+    # so workers log through the LOGGING config (JSON, queue, filters) as well.
+    pass
+
+
+@signals.worker_process_shutdown.connect
+@signals.worker_shutdown.connect
+def flush_on_shutdown(**kwargs):
+    # Pool processes leave through os._exit(), which skips atexit handlers.
+    flush_metrics()
+    stop_queue_logging()
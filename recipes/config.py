@@ -0,0 +1,118 @@
+import threading
+import time
+import uuid
+
+from constance import config as constance_config
+from django.conf import settings
+from django.core.cache import cache
+
+from recipes.logging import getLogger
+
+logger = getLogger(__name__)
+
+VERSION_CACHE_KEY = "config:version"
+
+
+class ConfigSnapshot:
+    """Constance values held in process memory for hot paths.
+
+    All values are loaded with one backend read and reused for up to ``ttl``
+    seconds. A version stamp in the Django cache, checked at most every
+    ``check_interval`` seconds, makes every process reload sooner after
+    ``invalidate``. If the cache cannot be reached the snapshot still expires
+    by its TTL. Assignments are written through to Constance.
+
+    Constance's database backend reads nothing, rather than raising, while
+    the database is unreachable. A load without any stored values is kept
+    only until the next version check. It never replaces values that were
+    read from the database.
+    """
+
+    def __init__(self, ttl: float, check_interval: float) -> None:
+        object.__setattr__(self, "_ttl", ttl)
+        object.__setattr__(self, "_check_interval", check_interval)
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_values", None)
+        object.__setattr__(self, "_has_stored", False)
+        object.__setattr__(self, "_version", None)
+        object.__setattr__(self, "_loaded_at", 0.0)
+        object.__setattr__(self, "_checked_at", 0.0)
+
+    def __getattr__(self, name):
+        try:
+            return self._get_values()[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        setattr(constance_config, name, value)
+
+    def _is_fresh(self, now: float) -> bool:
+        return (
+            self._values is not None
+            and now - self._loaded_at < self._ttl
+            and now - self._checked_at < self._check_interval
+        )
+
+    def _get_values(self) -> dict:
+        if self._is_fresh(time.monotonic()):
+            return self._values
+        with self._lock:
+            now = time.monotonic()
+            if self._is_fresh(now):
+                return self._values
+            version = self._read_version()
+            if (
+                self._values is None
+                or now - self._loaded_at >= self._ttl
+                or version != self._version
+            ):
+                self._load(now, version)
+            object.__setattr__(self, "_checked_at", now)
+            return self._values
+
+    def _load(self, now: float, version) -> None:
+        stored = dict(constance_config._backend.mget(settings.CONSTANCE_CONFIG))
+        loaded_at = now
+        if not stored:
+            # Expire with the next version check instead of after the full TTL.
+            loaded_at = now - self._ttl + self._check_interval
+            if self._has_stored:
+                logger.warning(
+                    "Config backend returned no values, keeping the previous ones"
+                )
+                object.__setattr__(self, "_loaded_at", loaded_at)
+                return
+        values = {
+            name: options[0] for name, options in settings.CONSTANCE_CONFIG.items()
+        }
+        values.update(stored)
+        object.__setattr__(self, "_values", values)
+        object.__setattr__(self, "_has_stored", bool(stored))
+        object.__setattr__(self, "_version", version)
+        object.__setattr__(self, "_loaded_at", loaded_at)
+
+    def _read_version(self):
+        try:
+            return cache.get(VERSION_CACHE_KEY)
+        except Exception as e:
+            logger.warning("Could not read config version, relying on the TTL: %s", e)
+            return self._version
+
+    def invalidate(self) -> None:
+        """Reload this process's values and tell the other processes to reload theirs."""
+        # Expired rather than dropped, so a failed reload can fall back to them.
+        object.__setattr__(self, "_loaded_at", float("-inf"))
+        try:
+            cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        except Exception as e:
+            logger.warning("Could not broadcast config invalidation: %s", e)
+
+
+config = ConfigSnapshot(
+    settings.CONFIG_SNAPSHOT_TTL, settings.CONFIG_VERSION_CHECK_INTERVAL
+)
+
+
+def invalidate_config() -> None:
+    config.invalidate()
@@ -1,7 +1,23 @@
-from constance import config
-
+from recipes.config import config
 from recipes.fdc.api import FdcApi
+from recipes.fdc.cache import get_response_cache
+from recipes.fdc.circuit import get_circuit_breaker
+from recipes.fdc.ratelimit import FdcRateLimiter
+
 
+def get_api(rate_limit_wait=None):
+    """Build an API client that shares rate limiting and circuit state with all workers.
 
-def get_api():
-    return FdcApi(config.FDC_API_KEY)
+    ``rate_limit_wait`` caps how long a request may wait for the limiter before
+    ``FdcRateLimited`` is raised; ``None`` waits as long as needed.
+    """
+    api_key = config.FDC_API_KEY
+    rate_limiter = FdcRateLimiter.for_api_key(
+        api_key, config.FDC_RATE_LIMIT_PER_HOUR, max_wait=rate_limit_wait
+    )
+    return FdcApi(
+        api_key,
+        rate_limiter=rate_limiter,
+        circuit_breaker=get_circuit_breaker(),
+        cache=get_response_cache(),
+    )
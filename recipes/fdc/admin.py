@@ -1,6 +1,17 @@
 from django.contrib import admin
 
-from recipes.fdc.models import FoodItem
+from recipes.fdc.models import FoodItem, FoodNutrient, FoodSyncShard, FoodSyncState
 
 # Register your models here.
 admin.site.register(FoodItem)
+admin.site.register(FoodSyncState)
+admin.site.register(FoodSyncShard)
+
+
+@admin.register(FoodNutrient)
+class FoodNutrientAdmin(admin.ModelAdmin):
+    # A <select> over every food would render hundreds of thousands of options.
+    raw_id_fields = ("food_item",)
+    list_display = ("food_item", "name", "amount", "unit")
+    list_select_related = ("food_item",)
+    show_full_result_count = False
@@ -1,5 +1,11 @@
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Generator, Optional
+from queue import Empty, Full, Queue
+from typing import Generator, Iterator, Optional
 
 import requests
 
@@ -10,10 +16,24 @@ from recipes.fdc.response_models import (
     SRLegacyFoodItem,
     SurveyFoodItem,
 )
-from recipes.logging import getLogger
+from recipes.fdc.cache import FdcResponseCache
+from recipes.fdc.circuit import CircuitBreaker
+from recipes.fdc.exceptions import FdcCircuitOpen, FdcRateLimited
+from recipes.fdc.ratelimit import FdcRateLimiter
+from recipes.fdc.transport import FdcTransport, get_transport
+from recipes.logging import SAMPLED, getLogger
+from recipes.metrics import fdc_request_duration, fdc_requests
 
 logger = getLogger(__name__)
 
+# FDC rejects multi-food requests with more than 20 IDs.
+MAX_FOODS_PER_REQUEST = 20
+
+# Collapses per-food endpoints (``v1/food/123``) into one metrics label.
+FDC_ID_PATH_RE = re.compile(r"/\d+")
+
+FoodDetail = BrandedFoodItem | FoundationFoodItem | SRLegacyFoodItem | SurveyFoodItem
+
 
 class FoodDataTypes(Enum):
     FOUNDATION = "Foundation"
@@ -23,9 +43,20 @@ class FoodDataTypes(Enum):
 
 
 class FdcApi:
-    def __init__(self, api_key: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        transport: Optional[FdcTransport] = None,
+        rate_limiter: Optional[FdcRateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        cache: Optional[FdcResponseCache] = None,
+    ) -> None:
         self._api_key = api_key
         self.base_url = "https://api.nal.usda.gov/fdc/"
+        self.transport = transport or get_transport()
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.cache = cache
 
     def get_headers(self) -> dict:
         return {
@@ -33,21 +64,96 @@ class FdcApi:
             "Accept": "application/json",
         }
 
-    def get(self, endpoint: str, params: dict) -> dict | list[dict]:
+    def get(
+        self, endpoint: str, params: dict, timeout: Optional[float] = None
+    ) -> dict | list[dict]:
+        """GET an endpoint and decode the JSON response.
+
+        A ``timeout`` bounds the whole call for interactive requests: it is
+        used as the connect and read timeout and transient failures are not
+        retried. Cached responses are returned without touching the network.
+        Every call is counted and timed by endpoint and outcome (the HTTP
+        status, ``cached``, or why no response was received).
+        """
+        labels = {
+            "endpoint": FDC_ID_PATH_RE.sub("/{fdc_id}", endpoint),
+            "outcome": "error",
+        }
+        started = time.perf_counter()
+        try:
+            return self._get(endpoint, params, timeout, labels)
+        except FdcCircuitOpen:
+            labels["outcome"] = "circuit_open"
+            raise
+        except FdcRateLimited:
+            if labels["outcome"] == "error":
+                labels["outcome"] = "rate_limited"
+            raise
+        except requests.exceptions.Timeout:
+            labels["outcome"] = "timeout"
+            raise
+        except requests.exceptions.ConnectionError:
+            labels["outcome"] = "connection_error"
+            raise
+        finally:
+            fdc_requests.inc(**labels)
+            fdc_request_duration.observe(time.perf_counter() - started, **labels)
+
+    def _get(
+        self, endpoint: str, params: dict, timeout: Optional[float], labels: dict
+    ) -> dict | list[dict]:
+        if self.cache:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                labels["outcome"] = "cached"
+                logger.debug(
+                    "Using cached response for %s with params: %s", endpoint, params
+                )
+                return cached
         params["api_key"] = self._api_key
-        logger.debug(f"Making API request to {endpoint} with params: {params}")
+        logger.debug("Making API request to %s with params: %s", endpoint, params)
+        if self.circuit_breaker:
+            self.circuit_breaker.before_request()
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        request_kwargs = {"timeout": timeout, "max_retries": 0} if timeout else {}
         try:
-            response = requests.get(
-                f"{self.base_url}{endpoint}", headers=self.get_headers(), params=params
-            )
+            try:
+                response = self.transport.request(
+                    "GET",
+                    f"{self.base_url}{endpoint}",
+                    headers=self.get_headers(),
+                    params=params,
+                    **request_kwargs,
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_failure()
+                raise
+            if self.circuit_breaker:
+                if response.status_code >= 500:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+            labels["outcome"] = str(response.status_code)
+            remaining = response.headers.get("X-RateLimit-Remaining")
+            if self.rate_limiter and remaining and remaining.isdigit():
+                self.rate_limiter.update_remaining(int(remaining))
+            if response.status_code == 429:
+                retry_after = self.transport.retry_after(response) or 60.0
+                logger.warning("FDC rate limit exceeded for %s", endpoint)
+                raise FdcRateLimited(retry_after)
             response.raise_for_status()
-            logger.debug(f"API request successful for {endpoint}")
-            return response.json()
+            logger.debug("API request successful for %s", endpoint)
+            result = response.json()
+            if self.cache:
+                self.cache.set(endpoint, params, result)
+            return result
         except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error for {endpoint}: {e}")
+            logger.error("HTTP error for %s: %s", endpoint, e)
             raise
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request exception for {endpoint}: {e}")
+            logger.error("Request exception for %s: %s", endpoint, e)
             raise
 
     def _get_food_list(
@@ -55,21 +161,36 @@ class FdcApi:
         data_type: Optional[FoodDataTypes] = None,
         page_size: int = 200,
         page_number: int = 1,
+        sort_by: Optional[str] = None,
+        sort_order: Optional[str] = None,
     ) -> list[dict]:
         params = {
             "dataType": data_type.value if data_type else None,
             "pageSize": page_size,
             "pageNumber": page_number,
         }
-        logger.info(f"Fetching food list page {page_number} for data type: {data_type}")
+        if sort_by:
+            params["sortBy"] = sort_by
+            params["sortOrder"] = sort_order or "asc"
+        logger.info(
+            "Fetching food list page %s for data type: %s",
+            page_number,
+            data_type,
+            extra=SAMPLED,
+        )
         result = self.get("v1/foods/list", params)
         if not isinstance(result, list):
             if not result:
-                logger.debug(f"No food items found for page {page_number}")
+                logger.debug("No food items found for page %s", page_number)
                 return []
-            logger.error(f"Expected list from API, got {type(result)}")
+            logger.error("Expected list from API, got %s", type(result))
             raise TypeError(f"Expected list, got {type(result)}")
-        logger.info(f"Retrieved {len(result)} food items from page {page_number}")
+        logger.info(
+            "Retrieved %s food items from page %s",
+            len(result),
+            page_number,
+            extra=SAMPLED,
+        )
         return result
 
     def get_food_list(
@@ -87,23 +208,215 @@ class FdcApi:
             for food in food_list:
                 yield AbridgedFoodItem.create_from_dict(food)
 
-    def get_food_by_fdc_id(self, fdc_id: int):
-        logger.info(f"Fetching food details for FDC ID: {fdc_id}")
-        food_dict = self.get(f"v1/food/{fdc_id}", {})
+    def get_food_list_pages(
+        self,
+        data_type: Optional[FoodDataTypes] = None,
+        prefetch: int = 0,
+        start_page: int = 1,
+        end_page: Optional[int] = None,
+        sort_by: Optional[str] = None,
+        sort_order: Optional[str] = None,
+    ) -> Iterator[tuple[int, list[AbridgedFoodItem]]]:
+        """Yield ``(page_number, items)`` for every list page, in order.
+
+        With ``prefetch`` > 1 up to that many pages are requested concurrently
+        while the caller processes earlier ones. ``sort_by`` is one of the FDC
+        list sort fields, e.g. ``publishedDate`` or ``fdcId``. Without
+        ``end_page`` the walk continues until the first empty page.
+        """
+        list_kwargs = dict(data_type=data_type, sort_by=sort_by, sort_order=sort_order)
+        if prefetch > 1:
+            return iter(
+                FoodListPrefetcher(self, prefetch, start_page, end_page, **list_kwargs)
+            )
+        return self._iter_food_list_pages(start_page, end_page, **list_kwargs)
+
+    def _iter_food_list_pages(
+        self, start_page: int, end_page: Optional[int], **list_kwargs
+    ) -> Generator[tuple[int, list[AbridgedFoodItem]], None, None]:
+        page_number = start_page
+        while end_page is None or page_number <= end_page:
+            food_list = self._get_food_list(page_number=page_number, **list_kwargs)
+            if not food_list:
+                break
+            yield page_number, [
+                AbridgedFoodItem.create_from_dict(food) for food in food_list
+            ]
+            page_number += 1
+
+    def count_food_list_pages(
+        self, data_type: Optional[FoodDataTypes] = None, **list_kwargs
+    ) -> int:
+        """Find the number of non-empty list pages in O(log n) requests.
+
+        Probes pages 1, 2, 4, ... until one is empty, then binary searches
+        between the last non-empty and the first empty page.
+        """
+
+        def has_page(page_number: int) -> bool:
+            return bool(
+                self._get_food_list(
+                    data_type=data_type, page_number=page_number, **list_kwargs
+                )
+            )
+
+        if not has_page(1):
+            return 0
+        low, high = 1, 2
+        while has_page(high):
+            low, high = high, high * 2
+        while high - low > 1:
+            middle = (low + high) // 2
+            if has_page(middle):
+                low = middle
+            else:
+                high = middle
+        logger.info("Found %s food list pages for data type: %s", low, data_type)
+        return low
+
+    def get_food_by_fdc_id(self, fdc_id: int, timeout: Optional[float] = None):
+        logger.info("Fetching food details for FDC ID: %s", fdc_id, extra=SAMPLED)
+        food_dict = self.get(f"v1/food/{fdc_id}", {}, timeout=timeout)
         if not isinstance(food_dict, dict):
-            logger.error(f"Expected dict from API for FDC ID {fdc_id}, got {type(food_dict)}")
+            logger.error(
+                "Expected dict from API for FDC ID %s, got %s", fdc_id, type(food_dict)
+            )
             raise TypeError(f"Expected dict, got {type(food_dict)}")
+        return parse_food_detail(food_dict)
+
+    def get_foods_by_fdc_ids(self, fdc_ids: list[int]) -> list[dict]:
+        """Fetch full details for many foods, up to 20 per request.
+
+        Returns the raw food dicts; IDs that FDC does not know are simply absent.
+        """
+        foods = []
+        for start in range(0, len(fdc_ids), MAX_FOODS_PER_REQUEST):
+            end = start + MAX_FOODS_PER_REQUEST
+            chunk = fdc_ids[start:end]
+            logger.info(
+                "Fetching food details for %s FDC IDs", len(chunk), extra=SAMPLED
+            )
+            result = self.get(
+                "v1/foods", {"fdcIds": ",".join(str(fdc_id) for fdc_id in chunk)}
+            )
+            if not isinstance(result, list):
+                logger.error("Expected list from API, got %s", type(result))
+                raise TypeError(f"Expected list, got {type(result)}")
+            foods.extend(result)
+        return foods
+
+
+class FoodListPrefetcher:
+    """Fetches food list pages ahead of the consumer on a thread pool.
+
+    A producer thread keeps ``concurrency`` page requests in flight and hands
+    completed pages over, in page order, through a bounded queue, so a slow
+    consumer throttles fetching instead of buffering a whole data type. The
+    first empty page (or ``end_page``) marks the end of the walk; speculative
+    requests for later pages are discarded.
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        api: FdcApi,
+        concurrency: int,
+        start_page: int = 1,
+        end_page: Optional[int] = None,
+        **list_kwargs,
+    ) -> None:
+        self.api = api
+        self.concurrency = concurrency
+        self.start_page = start_page
+        self.end_page = end_page
+        self.list_kwargs = list_kwargs
+
+    def __iter__(self) -> Generator[tuple[int, list[AbridgedFoodItem]], None, None]:
+        pages = Queue(maxsize=self.concurrency)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce, args=(pages, stop), name="fdc-prefetch", daemon=True
+        )
+        producer.start()
+        try:
+            while True:
+                page = pages.get()
+                if page is self._DONE:
+                    return
+                if isinstance(page, BaseException):
+                    raise page
+                yield page
+        finally:
+            stop.set()
+            while producer.is_alive():
+                try:
+                    pages.get(timeout=0.1)
+                except Empty:
+                    pass
+            producer.join()
+
+    def _put(self, pages: Queue, stop: threading.Event, page) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _fetch(self, page_number: int) -> list[AbridgedFoodItem]:
+        food_list = self.api._get_food_list(page_number=page_number, **self.list_kwargs)
+        return [AbridgedFoodItem.create_from_dict(food) for food in food_list]
+
+    def _produce(self, pages: Queue, stop: threading.Event) -> None:
+        executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="fdc-prefetch"
+        )
+        in_flight = deque()
+        next_page = self.start_page
+        try:
+            while not stop.is_set():
+                while len(in_flight) < self.concurrency and (
+                    self.end_page is None or next_page <= self.end_page
+                ):
+                    in_flight.append(
+                        (next_page, executor.submit(self._fetch, next_page))
+                    )
+                    next_page += 1
+                if not in_flight:
+                    break
+                page_number, future = in_flight.popleft()
+                food_list = future.result()
+                if not food_list:
+                    logger.info(
+                        "Reached end of %s food list at page %s, discarding %s speculative pages",
+                        self.list_kwargs.get("data_type"),
+                        page_number,
+                        len(in_flight),
+                    )
+                    break
+                if not self._put(pages, stop, (page_number, food_list)):
+                    return
+        except BaseException as e:
+            self._put(pages, stop, e)
+            return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._put(pages, stop, self._DONE)
+
 
-        data_type = food_dict.get("dataType")
-        logger.debug(f"Processing food item with data type: {data_type}")
-        if data_type == FoodDataTypes.BRANDED.value:
-            return BrandedFoodItem.model_validate(food_dict)
-        elif data_type == FoodDataTypes.FOUNDATION.value:
-            return FoundationFoodItem.model_validate(food_dict)
-        elif data_type == FoodDataTypes.SR_LEGACY.value:
-            return SRLegacyFoodItem.model_validate(food_dict)
-        elif data_type == FoodDataTypes.SURVEY.value:
-            return SurveyFoodItem.model_validate(food_dict)
-        else:
-            logger.error(f"Unknown data type encountered: {data_type}")
-            raise ValueError(f"Unknown data type: {data_type}")
+def parse_food_detail(food_dict: dict) -> FoodDetail:
+    data_type = food_dict.get("dataType")
+    logger.debug("Processing food item with data type: %s", data_type)
+    if data_type == FoodDataTypes.BRANDED.value:
+        return BrandedFoodItem.model_validate(food_dict)
+    elif data_type == FoodDataTypes.FOUNDATION.value:
+        return FoundationFoodItem.model_validate(food_dict)
+    elif data_type == FoodDataTypes.SR_LEGACY.value:
+        return SRLegacyFoodItem.model_validate(food_dict)
+    elif data_type == FoodDataTypes.SURVEY.value:
+        return SurveyFoodItem.model_validate(food_dict)
+    else:
+        logger.error("Unknown data type encountered: %s", data_type)
+        raise ValueError(f"Unknown data type: {data_type}")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FdcConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "recipes.fdc"
+
+    def ready(self):
+        from recipes.fdc import signals  # noqa: F401
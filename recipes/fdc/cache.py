@@ -0,0 +1,174 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+
+from recipes.fdc.exceptions import FdcCacheMiss
+from recipes.logging import getLogger
+
+logger = getLogger(__name__)
+
+# Eviction trims the cache to this fraction of its size limit so that it does
+# not have to rescan the directory on every following write.
+EVICT_TO = 0.9
+
+
+class FdcResponseCache:
+    """On-disk cache of decoded FDC responses, addressed by request content.
+
+    Entries are keyed on the endpoint and query parameters, never the API key,
+    so a cache recorded with one key replays with any other. Each entry is a
+    gzip-compressed JSON file; reads refresh its mtime, which eviction uses as
+    the least-recently-used order once ``max_bytes`` is exceeded. In
+    ``offline`` mode entries never expire and a miss raises ``FdcCacheMiss``
+    instead of reaching the network.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        offline: bool = False,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @classmethod
+    def from_settings(cls) -> Optional["FdcResponseCache"]:
+        if not settings.FDC_CACHE_DIR:
+            return None
+        return cls(
+            settings.FDC_CACHE_DIR,
+            ttl=settings.FDC_CACHE_TTL or None,
+            max_bytes=settings.FDC_CACHE_MAX_BYTES or None,
+            offline=settings.FDC_CACHE_OFFLINE,
+        )
+
+    @staticmethod
+    def key(endpoint: str, params: dict) -> str:
+        request = {
+            "endpoint": endpoint,
+            "params": {
+                name: str(value)
+                for name, value in params.items()
+                if name != "api_key" and value is not None
+            },
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def _increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def get(self, endpoint: str, params: dict):
+        """Return the cached response, or ``None`` on a miss outside offline mode."""
+        path = self._path(self.key(endpoint, params))
+        try:
+            stat = path.stat()
+            if not self.offline and self.ttl and time.time() - stat.st_mtime > self.ttl:
+                raise FileNotFoundError(path)
+            with gzip.open(path, "rt", encoding="utf-8") as entry:
+                data = json.load(entry)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            self._increment("misses")
+            if self.offline:
+                raise FdcCacheMiss(
+                    f"No cached FDC response for {endpoint} {params}"
+                ) from e
+            return None
+        self._increment("hits")
+        return data
+
+    def set(self, endpoint: str, params: dict, data) -> None:
+        path = self._path(self.key(endpoint, params))
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+                tmp_path = tmp.name
+                with gzip.GzipFile(fileobj=tmp, mode="wb") as entry:
+                    entry.write(json.dumps(data).encode())
+            os.replace(tmp_path, path)
+            written = path.stat().st_size
+        except OSError as e:
+            logger.warning("Could not write FDC response cache entry %s: %s", path, e)
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        self._increment("writes")
+        if self.max_bytes:
+            with self._lock:
+                if self._size is None:
+                    self._size = self._scan_size()
+                self._size += written
+                if self._size > self.max_bytes:
+                    self._evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        evicted = 0
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes * EVICT_TO:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            size -= entry_size
+            evicted += 1
+        self._size = size
+        self._counters["evictions"] += evicted
+        logger.info(
+            "Evicted %s FDC response cache entries, %s bytes remain", evicted, size
+        )
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+
+_cache: Optional[FdcResponseCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[FdcResponseCache]:
+    """Return this process's response cache, or ``None`` when caching is off."""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        with _cache_lock:
+            if not _cache_loaded:
+                _cache = FdcResponseCache.from_settings()
+                _cache_loaded = True
+    return _cache
@@ -0,0 +1,126 @@
+import time
+from datetime import datetime, timezone
+
+import redis
+from django.conf import settings
+
+from recipes.fdc.exceptions import FdcCircuitOpen
+from recipes.logging import getLogger
+from recipes.redis_client import get_redis
+
+logger = getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Circuit breaker whose state lives in Redis and is shared by all processes.
+
+    After ``failure_threshold`` consecutive transport failures the circuit
+    opens and calls fail fast with ``FdcCircuitOpen``. Once ``reset_timeout``
+    has passed a single half-open probe request is let through; its success
+    closes the circuit and its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        probe_timeout: float,
+    ) -> None:
+        self.client = client
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self._failures_key = f"{name}:failures"
+        self._opened_at_key = f"{name}:opened_at"
+        self._probe_key = f"{name}:probe"
+
+    def _opened_at(self):
+        opened_at = self.client.get(self._opened_at_key)
+        return float(opened_at) if opened_at is not None else None
+
+    def before_request(self) -> None:
+        """Raise ``FdcCircuitOpen`` unless a request may be made now."""
+        try:
+            opened_at = self._opened_at()
+            if opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.time() - opened_at)
+            if remaining > 0:
+                raise FdcCircuitOpen(remaining)
+            if not self.client.set(
+                self._probe_key, 1, nx=True, ex=int(self.probe_timeout)
+            ):
+                raise FdcCircuitOpen(self.probe_timeout)
+            logger.info("FDC circuit half-open, sending probe request")
+        except redis.RedisError as e:
+            logger.warning("Circuit breaker unavailable, allowing request: %s", e)
+
+    def record_success(self) -> None:
+        try:
+            pipe = self.client.pipeline()
+            pipe.delete(self._failures_key)
+            pipe.delete(self._opened_at_key)
+            pipe.delete(self._probe_key)
+            _, was_open, _ = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not record FDC success in circuit breaker: %s", e)
+            return
+        if was_open:
+            logger.info("FDC circuit closed")
+
+    def record_failure(self) -> None:
+        try:
+            failures = self.client.incr(self._failures_key)
+            if failures >= self.failure_threshold:
+                pipe = self.client.pipeline()
+                pipe.set(self._opened_at_key, time.time())
+                pipe.delete(self._probe_key)
+                pipe.execute()
+                logger.warning(
+                    "FDC circuit open after %s consecutive failures", failures
+                )
+        except redis.RedisError as e:
+            logger.warning("Could not record FDC failure in circuit breaker: %s", e)
+
+    def is_open(self) -> bool:
+        return self.get_state()["state"] == self.OPEN
+
+    def get_state(self) -> dict:
+        try:
+            opened_at = self._opened_at()
+            failures = int(self.client.get(self._failures_key) or 0)
+        except redis.RedisError as e:
+            logger.warning("Could not read circuit breaker state: %s", e)
+            return {"state": "unknown"}
+        state = {
+            "state": self.CLOSED,
+            "consecutive_failures": failures,
+            "failure_threshold": self.failure_threshold,
+            "opened_at": None,
+            "retry_after": None,
+        }
+        if opened_at is not None:
+            remaining = self.reset_timeout - (time.time() - opened_at)
+            state["state"] = self.OPEN if remaining > 0 else self.HALF_OPEN
+            state["opened_at"] = datetime.fromtimestamp(
+                opened_at, tz=timezone.utc
+            ).isoformat()
+            state["retry_after"] = max(0.0, remaining)
+        return state
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        get_redis(),
+        "fdc:circuit",
+        failure_threshold=settings.FDC_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.FDC_CIRCUIT_RESET_TIMEOUT,
+        probe_timeout=settings.FDC_HTTP_CONNECT_TIMEOUT
+        + settings.FDC_HTTP_READ_TIMEOUT,
+    )
@@ -0,0 +1,179 @@
+import csv
+import json
+import re
+from typing import Iterator, Optional, TextIO
+
+from recipes.fdc.api import FoodDataTypes, parse_food_detail
+from recipes.fdc.models import FoodItemDetail
+from recipes.fdc.sync import extract_food_category, extract_food_nutrients
+from recipes.logging import getLogger
+
+logger = getLogger(__name__)
+
+# Matches a whole string literal (group 1 is None while it is still unterminated
+# at the end of the buffer) or a single structural bracket.
+_JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*(")?|[{}\[\]]', re.DOTALL)
+
+CSV_DATA_TYPES = {
+    "foundation_food": FoodDataTypes.FOUNDATION.value,
+    "sr_legacy_food": FoodDataTypes.SR_LEGACY.value,
+    "survey_fndds_food": FoodDataTypes.SURVEY.value,
+    "branded_food": FoodDataTypes.BRANDED.value,
+}
+
+FOOD_COLUMNS = (
+    "fdc_id",
+    "data_type",
+    "description",
+    "brand_name",
+    "food_category",
+    "detail_fetch_date",
+)
+
+# Staged food rows also carry the compressed detail for FoodItemDetail.
+COPY_COLUMNS = FOOD_COLUMNS + ("detail", "detail_size")
+
+NUTRIENT_COPY_COLUMNS = ("fdc_id", "nutrient_id", "name", "amount", "unit")
+
+
+def iter_json_objects(
+    stream: TextIO, depth: int = 2, read_size: int = 1 << 20
+) -> Iterator[str]:
+    """Yield the raw text of every JSON object nested ``depth`` levels deep.
+
+    FDC JSON dumps are a single document shaped like ``{"BrandedFoods": [...]}``,
+    so the default depth yields each food without decoding the whole file.
+    """
+    buffer = ""
+    position = 0
+    level = 0
+    start = None
+    while True:
+        chunk = stream.read(read_size)
+        buffer += chunk
+        for match in _JSON_TOKEN_RE.finditer(buffer, position):
+            token = match.group()
+            if token[0] == '"':
+                if match.group(1) is None:
+                    if not chunk:
+                        raise ValueError("Unterminated string at end of JSON dump")
+                    position = match.start()
+                    break
+                continue
+            if token in "{[":
+                if level == depth and token == "{":
+                    start = match.start()
+                level += 1
+            else:
+                level -= 1
+                if level == depth and start is not None:
+                    end = match.end()
+                    yield buffer[start:end]
+                    start = None
+        else:
+            position = len(buffer)
+        keep_from = position if start is None else min(start, position)
+        buffer = buffer[keep_from:]
+        position -= keep_from
+        if start is not None:
+            start -= keep_from
+        if not chunk:
+            return
+
+
+def iter_csv_rows(stream: TextIO) -> Iterator[dict]:
+    yield from csv.DictReader(stream)
+
+
+def copy_escape(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bytes):
+        # bytea hex input; the backslash itself is escaped below.
+        value = "\\x" + value.hex()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def format_copy_row(values) -> str:
+    return "\t".join(copy_escape(value) for value in values) + "\n"
+
+
+def parse_json_chunk(
+    raw_foods: list[str], fetched_at: str, default_data_type: Optional[str] = None
+) -> tuple[str, str, int, int]:
+    """Validate raw dump foods and format them as ``COPY`` text rows.
+
+    Returns the food rows, their nutrient rows and the number of imported and
+    skipped foods.
+    """
+    lines = []
+    nutrient_lines = []
+    skipped = 0
+    for raw_food in raw_foods:
+        try:
+            food_dict = json.loads(raw_food)
+            if default_data_type and not food_dict.get("dataType"):
+                food_dict["dataType"] = default_data_type
+            food_detail = parse_food_detail(food_dict)
+        except Exception as e:
+            logger.warning("Skipping invalid food in dump: %s", e)
+            skipped += 1
+            continue
+        detail = food_detail.model_dump()
+        detail_record = FoodItemDetail.from_detail(food_detail.fdcId, detail)
+        lines.append(
+            format_copy_row(
+                (
+                    food_detail.fdcId,
+                    food_detail.dataType,
+                    food_detail.description,
+                    getattr(food_detail, "brandOwner", None),
+                    extract_food_category(detail),
+                    fetched_at,
+                    detail_record.data,
+                    detail_record.size,
+                )
+            )
+        )
+        nutrient_lines.extend(
+            format_copy_row((food_detail.fdcId, *nutrient))
+            for nutrient in extract_food_nutrients(detail)
+        )
+    return "".join(lines), "".join(nutrient_lines), len(lines), skipped
+
+
+def parse_csv_chunk(rows: list[dict]) -> tuple[str, str, int, int]:
+    """Format ``food.csv`` rows as ``COPY`` text rows, skipping unsupported data types."""
+    lines = []
+    skipped = 0
+    for row in rows:
+        data_type = CSV_DATA_TYPES.get(row.get("data_type"))
+        if data_type is None:
+            skipped += 1
+            continue
+        try:
+            fdc_id = int(row["fdc_id"])
+        except (KeyError, TypeError, ValueError):
+            skipped += 1
+            continue
+        lines.append(
+            format_copy_row(
+                (
+                    fdc_id,
+                    data_type,
+                    row.get("description") or "",
+                    None,
+                    None,
+                    None,
+                    None,
+                    None,
+                )
+            )
+        )
+    return "".join(lines), "", len(lines), skipped
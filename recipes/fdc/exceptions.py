@@ -0,0 +1,20 @@
+class FdcUnavailable(Exception):
+    """The FDC API cannot be called right now; retry after ``retry_after`` seconds."""
+
+    reason = "FDC API unavailable"
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"{self.reason}, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class FdcRateLimited(FdcUnavailable):
+    reason = "FDC rate limit reached"
+
+
+class FdcCircuitOpen(FdcUnavailable):
+    reason = "FDC circuit breaker is open"
+
+
+class FdcCacheMiss(Exception):
+    """An offline replay asked for a response that was never recorded."""
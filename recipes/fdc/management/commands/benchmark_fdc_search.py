@@ -0,0 +1,111 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from recipes.fdc.management.commands.benchmark_fdc_upsert import BENCHMARK_FDC_ID_OFFSET
+from recipes.fdc.models import FoodItem
+from recipes.fdc.search import search_food_items
+
+# Vocabulary the synthetic descriptions and brands are drawn from.
+WORDS = [
+    "apple", "banana", "bread", "butter", "cheddar", "cheese", "chicken", "chocolate",
+    "cookie", "corn", "cream", "egg", "flour", "garlic", "honey", "milk", "oat", "olive",
+    "onion", "orange", "pasta", "peanut", "pepper", "pork", "potato", "rice", "salmon",
+    "salt", "sauce", "spinach", "sugar", "tomato", "turkey", "vanilla", "wheat", "yogurt",
+]  # fmt: skip
+DEFAULT_TERMS = [
+    "cheddar",
+    "chick",
+    "chocolate cookie",
+    "tomatoe sauce",
+    "whole wheat bread",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the latency of a food search page (count plus first page) using the old "
+        "icontains scan and the indexed full-text/trigram search, on synthetic food items."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--data-type", choices=FoodItem.DataType.values)
+        parser.add_argument("--term", action="append", dest="terms")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        terms = options["terms"] or DEFAULT_TERMS
+        try:
+            self._cleanup()
+            started = time.perf_counter()
+            self._insert_rows(rows)
+            self.stdout.write(
+                f"Inserted {rows} rows in {time.perf_counter() - started:.1f}s"
+            )
+            queryset = FoodItem.objects.defer("legacy_detail")
+            if options["data_type"]:
+                queryset = queryset.filter(data_type=options["data_type"])
+            for term in terms:
+                for label, search in (
+                    ("icontains", self._search_icontains),
+                    ("indexed", search_food_items),
+                ):
+                    timings = []
+                    for _ in range(options["repeat"]):
+                        started = time.perf_counter()
+                        results = search(queryset, term)
+                        count = results.count()
+                        list(results[: options["page_size"]])
+                        timings.append((time.perf_counter() - started) * 1000)
+                    self.stdout.write(
+                        f"{term!r:>22} {label:>9}: {statistics.median(timings):>9.1f} ms "
+                        f"median ({count} matches)"
+                    )
+        finally:
+            self._cleanup()
+
+    def _search_icontains(self, queryset, term: str):
+        for word in term.split():
+            queryset = queryset.filter(description__icontains=word)
+        return queryset.order_by("description", "id")
+
+    def _insert_rows(self, rows: int) -> None:
+        table = FoodItem._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table}
+                    (fdc_id, data_type, description, brand_name, error_count, detail_priority)
+                SELECT
+                    %(offset)s + i,
+                    t[1 + i %% cardinality(t)],
+                    initcap(concat_ws(
+                        ' ',
+                        w[1 + (i * 7) %% cardinality(w)],
+                        w[1 + (i / 3) %% cardinality(w)],
+                        w[1 + (i * 13 + 5) %% cardinality(w)]
+                    )) || ' ' || i,
+                    CASE WHEN i %% 4 = 0
+                        THEN initcap(w[1 + (i / 7) %% cardinality(w)]) || ' Foods'
+                    END,
+                    0,
+                    0
+                FROM generate_series(1, %(rows)s) AS i,
+                    (SELECT %(words)s::text[] AS w, %(data_types)s::text[] AS t) AS vocabulary
+                """,
+                {
+                    "offset": BENCHMARK_FDC_ID_OFFSET,
+                    "data_types": FoodItem.DataType.values,
+                    "words": WORDS,
+                    "rows": rows,
+                },
+            )
+            cursor.execute(f"ANALYZE {table}")
+
+    def _cleanup(self) -> None:
+        FoodItem.objects.filter(fdc_id__gte=BENCHMARK_FDC_ID_OFFSET).delete()
@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.fdc.models import FoodItem
+from recipes.fdc.response_models import AbridgedFoodItem
+from recipes.fdc.sync import upsert_food_items
+
+# Synthetic rows use FDC IDs far above the real ID range and are deleted afterwards.
+BENCHMARK_FDC_ID_OFFSET = 2_000_000_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows per second of the per-row update_or_create sync path with the "
+        "page-at-a-time bulk upsert, using synthetic food items."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--page-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        page_size = options["page_size"]
+        pages = [
+            self._make_page(start, min(start + page_size, rows), "original")
+            for start in range(0, rows, page_size)
+        ]
+        changed_pages = [
+            self._make_page(start, min(start + page_size, rows), "changed")
+            for start in range(0, rows, page_size)
+        ]
+        try:
+            for label, write_page in (
+                ("update_or_create", self._write_page_per_row),
+                ("bulk upsert", upsert_food_items),
+            ):
+                self._cleanup()
+                for phase, phase_pages in (
+                    ("insert", pages),
+                    ("update", changed_pages),
+                    ("unchanged", changed_pages),
+                ):
+                    started = time.perf_counter()
+                    for page in phase_pages:
+                        write_page(page)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{label:>16} {phase:>9}: {rows / elapsed:>10,.0f} rows/s "
+                        f"({elapsed:.2f}s for {rows} rows)"
+                    )
+        finally:
+            self._cleanup()
+
+    def _make_page(self, start: int, end: int, variant: str) -> list[AbridgedFoodItem]:
+        return [
+            AbridgedFoodItem(
+                dataType="Branded",
+                description=f"Benchmark food {index} ({variant})",
+                fdcId=BENCHMARK_FDC_ID_OFFSET + index,
+                foodNutrients=[],
+                publicationDate="2024-10-31",
+                brandOwner=f"Benchmark brand {index % 100}",
+            )
+            for index in range(start, end)
+        ]
+
+    def _write_page_per_row(self, food_items: list[AbridgedFoodItem]) -> None:
+        for instance in food_items:
+            FoodItem.objects.update_or_create(
+                fdc_id=instance.fdcId,
+                defaults=dict(
+                    data_type=instance.dataType,
+                    description=instance.description,
+                    brand_name=instance.brandOwner,
+                ),
+            )
+
+    def _cleanup(self) -> None:
+        FoodItem.objects.filter(fdc_id__gte=BENCHMARK_FDC_ID_OFFSET).delete()
@@ -0,0 +1,195 @@
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from recipes.fdc.api import FoodDataTypes
+from recipes.fdc.dumps import (
+    COPY_COLUMNS,
+    FOOD_COLUMNS,
+    NUTRIENT_COPY_COLUMNS,
+    iter_csv_rows,
+    iter_json_objects,
+    parse_csv_chunk,
+    parse_json_chunk,
+)
+from recipes.fdc.models import FoodItem, FoodItemDetail, FoodNutrient
+from recipes.fdc.parallel import bounded_map, chunked
+
+STAGING_TABLE = "fdc_fooditem_import"
+NUTRIENT_STAGING_TABLE = "fdc_foodnutrient_import"
+
+
+class Command(BaseCommand):
+    help = (
+        "Import food items from a downloaded FoodData Central dataset archive. JSON "
+        "archives load full details; CSV archives load the abridged rows from food.csv. "
+        "The archive is streamed, parsed in a process pool and loaded with COPY."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the FDC .zip download")
+        parser.add_argument(
+            "--member", help="File inside the archive to import (detected by default)"
+        )
+        parser.add_argument(
+            "--data-type",
+            choices=[data_type.value for data_type in FoodDataTypes],
+            help="Data type for JSON foods that do not carry a dataType field",
+        )
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--batch-size", type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        try:
+            archive = zipfile.ZipFile(options["path"])
+        except (OSError, zipfile.BadZipFile) as e:
+            raise CommandError(f"Cannot open {options['path']}: {e}")
+
+        with archive:
+            member = options["member"] or self._find_member(archive)
+            self.stdout.write(f"Importing {member} from {options['path']}")
+            with (
+                archive.open(member) as raw,
+                io.TextIOWrapper(raw, encoding="utf-8-sig", newline="") as stream,
+            ):
+                if member.lower().endswith(".json"):
+                    records = iter_json_objects(stream)
+                    parse = partial(
+                        parse_json_chunk,
+                        fetched_at=timezone.now().isoformat(),
+                        default_data_type=options["data_type"],
+                    )
+                else:
+                    records = iter_csv_rows(stream)
+                    parse = parse_csv_chunk
+
+                workers = max(1, options["workers"])
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    chunks = bounded_map(
+                        executor,
+                        parse,
+                        chunked(records, options["chunk_size"]),
+                        workers * 2,
+                    )
+                    self._load(chunks, options["batch_size"])
+
+    def _find_member(self, archive: zipfile.ZipFile) -> str:
+        names = archive.namelist()
+        json_members = [name for name in names if name.lower().endswith(".json")]
+        if len(json_members) == 1:
+            return json_members[0]
+        csv_members = [name for name in names if os.path.basename(name) == "food.csv"]
+        if len(csv_members) == 1:
+            return csv_members[0]
+        raise CommandError(
+            "Could not find a single JSON file or food.csv in the archive; use --member"
+        )
+
+    def _load(self, chunks, batch_size: int) -> None:
+        started = time.perf_counter()
+        imported = 0
+        skipped = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} ("
+                "fdc_id integer, data_type varchar(20), description varchar(2000), "
+                "brand_name varchar(1000), food_category varchar(255), "
+                "detail_fetch_date timestamptz, detail bytea, "
+                "detail_size integer)"
+            )
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {NUTRIENT_STAGING_TABLE} ("
+                "fdc_id integer, nutrient_id integer, name varchar(255), "
+                "amount double precision, unit varchar(20))"
+            )
+            buffer = io.StringIO()
+            nutrient_buffer = io.StringIO()
+            buffered = 0
+            for rows, nutrient_rows, chunk_imported, chunk_skipped in chunks:
+                buffer.write(rows)
+                nutrient_buffer.write(nutrient_rows)
+                buffered += chunk_imported
+                skipped += chunk_skipped
+                if buffered >= batch_size:
+                    self._copy_batch(cursor, buffer, nutrient_buffer)
+                    imported += buffered
+                    buffered = 0
+                    buffer = io.StringIO()
+                    nutrient_buffer = io.StringIO()
+                    self._report(imported, skipped, started)
+            if buffered:
+                self._copy_batch(cursor, buffer, nutrient_buffer)
+                imported += buffered
+            cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+            cursor.execute(f"DROP TABLE IF EXISTS {NUTRIENT_STAGING_TABLE}")
+        self._report(imported, skipped, started)
+        self.stdout.write(self.style.SUCCESS("Import complete"))
+
+    def _copy_batch(
+        self, cursor, buffer: io.StringIO, nutrient_buffer: io.StringIO
+    ) -> None:
+        table = FoodItem._meta.db_table
+        detail_table = FoodItemDetail._meta.db_table
+        columns = ", ".join(FOOD_COLUMNS)
+        buffer.seek(0)
+        with transaction.atomic():
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} ({', '.join(COPY_COLUMNS)}) FROM STDIN", buffer
+            )
+            # Foods that arrive with a detail drop any legacy uncompressed copy.
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}, error_count, detail_priority) "
+                f"SELECT DISTINCT ON (fdc_id) {columns}, 0, 0 FROM {STAGING_TABLE} "
+                "ORDER BY fdc_id "
+                "ON CONFLICT (fdc_id) DO UPDATE SET "
+                "data_type = EXCLUDED.data_type, "
+                "description = EXCLUDED.description, "
+                f"brand_name = COALESCE(EXCLUDED.brand_name, {table}.brand_name), "
+                f"food_category = COALESCE(EXCLUDED.food_category, {table}.food_category), "
+                f"detail = CASE WHEN EXCLUDED.detail_fetch_date IS NULL "
+                f"THEN {table}.detail END, "
+                f"detail_fetch_date = COALESCE(EXCLUDED.detail_fetch_date, "
+                f"{table}.detail_fetch_date)"
+            )
+            cursor.execute(
+                f"INSERT INTO {detail_table} (fdc_id, data, size) "
+                f"SELECT DISTINCT ON (fdc_id) fdc_id, detail, detail_size FROM {STAGING_TABLE} "
+                "WHERE detail IS NOT NULL ORDER BY fdc_id "
+                "ON CONFLICT (fdc_id) DO UPDATE SET data = EXCLUDED.data, size = EXCLUDED.size"
+            )
+            self._copy_nutrients(cursor, nutrient_buffer)
+            cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+
+    def _copy_nutrients(self, cursor, nutrient_buffer: io.StringIO) -> None:
+        """Replace the nutrient rows of every food in the batch that carried a detail."""
+        table = FoodNutrient._meta.db_table
+        columns = ", ".join(NUTRIENT_COPY_COLUMNS)
+        nutrient_buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {NUTRIENT_STAGING_TABLE} ({columns}) FROM STDIN", nutrient_buffer
+        )
+        cursor.execute(
+            f"DELETE FROM {table} WHERE fdc_id IN "
+            f"(SELECT fdc_id FROM {STAGING_TABLE} WHERE detail IS NOT NULL)"
+        )
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) "
+            f"SELECT DISTINCT ON (fdc_id, nutrient_id) {columns} FROM {NUTRIENT_STAGING_TABLE} "
+            "ORDER BY fdc_id, nutrient_id"
+        )
+        cursor.execute(f"TRUNCATE {NUTRIENT_STAGING_TABLE}")
+
+    def _report(self, imported: int, skipped: int, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{imported} foods imported, {skipped} skipped "
+            f"({imported / elapsed if elapsed else 0:,.0f} foods/s)"
+        )
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.fdc.models import FoodItem, FoodItemDetail
+
+
+class Command(BaseCommand):
+    help = (
+        "Move food details saved in the legacy FoodItem.detail column into compressed "
+        "FoodItemDetail rows, in batches ordered by primary key. Details already stored "
+        "in FoodItemDetail are newer and are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        started = time.perf_counter()
+        moved = 0
+        raw_bytes = 0
+        compressed_bytes = 0
+        last_id = 0
+        while True:
+            batch = list(
+                FoodItem.objects.filter(id__gt=last_id, legacy_detail__isnull=False)
+                .order_by("id")
+                .values_list("id", "fdc_id", "legacy_detail")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            records = [
+                FoodItemDetail.from_detail(fdc_id, detail)
+                for _, fdc_id, detail in batch
+            ]
+            with transaction.atomic():
+                FoodItemDetail.objects.bulk_create(records, ignore_conflicts=True)
+                FoodItem.objects.filter(
+                    id__in=[item_id for item_id, _, _ in batch]
+                ).update(legacy_detail=None)
+            moved += len(batch)
+            raw_bytes += sum(record.size for record in records)
+            compressed_bytes += sum(len(record.data) for record in records)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{moved} details moved, {raw_bytes:,} bytes compressed to "
+                f"{compressed_bytes:,} ({moved / elapsed if elapsed else 0:,.0f} details/s)"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Migration complete; run VACUUM on the food item table to reclaim space"
+            )
+        )
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, CharField, Value, When
+
+from recipes.fdc.models import FoodItem, FoodItemDetail
+from recipes.fdc.sync import extract_food_category, replace_food_nutrients
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the data projected from stored food details (FoodNutrient rows and the "
+        "food category) for every food item with a detail, in batches ordered by FDC ID. "
+        "Run migrate_food_item_details first so legacy details are included."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        started = time.perf_counter()
+        foods = 0
+        nutrients = 0
+        last_fdc_id = 0
+        while True:
+            batch = list(
+                FoodItemDetail.objects.filter(pk__gt=last_fdc_id).order_by("pk")[
+                    :batch_size
+                ]
+            )
+            if not batch:
+                break
+            last_fdc_id = batch[-1].pk
+            details = {record.pk: record.get_detail() for record in batch}
+            with transaction.atomic():
+                nutrients += replace_food_nutrients(details)
+                self._update_categories(details)
+            foods += len(batch)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{foods} foods rebuilt, {nutrients} nutrients "
+                f"({foods / elapsed if elapsed else 0:,.0f} foods/s)"
+            )
+        self.stdout.write(self.style.SUCCESS("Rebuild complete"))
+
+    def _update_categories(self, details: dict[int, dict]) -> None:
+        FoodItem.objects.filter(fdc_id__in=details.keys()).update(
+            food_category=Case(
+                *(
+                    When(fdc_id=fdc_id, then=Value(extract_food_category(detail)))
+                    for fdc_id, detail in details.items()
+                ),
+                output_field=CharField(),
+            )
+        )
@@ -0,0 +1,113 @@
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, CharField, Value, When
+
+from recipes.fdc.models import FoodItem, FoodItemDetail
+from recipes.fdc.parallel import bounded_map, chunked
+from recipes.fdc.sync import replace_food_nutrient_rows, revalidate_detail_chunk
+
+# Validation errors listed per data type in the final report.
+MAX_REPORTED_ERRORS = 5
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-run the FDC response models over every stored food detail after they change, "
+        "without calling the API. Details are streamed with a server-side cursor, "
+        "validated in a process pool and written back in batches together with their "
+        "nutrients and food category. Details that no longer validate are kept as they "
+        "are and reported per data type."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Validate and report without writing"
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        checked = Counter()
+        updated = Counter()
+        failures = defaultdict(list)
+        chunks = chunked(
+            self._iter_details(checked, options["chunk_size"]), options["chunk_size"]
+        )
+        workers = max(1, options["workers"])
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for changed, failed in bounded_map(
+                executor, revalidate_detail_chunk, chunks, workers * 2
+            ):
+                updated.update(detail.data_type for detail in changed)
+                for fdc_id, data_type, error in failed:
+                    failures[data_type].append((fdc_id, error))
+                if changed and not options["dry_run"]:
+                    self._write(changed)
+                total = sum(checked.values())
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{total} details checked, {sum(updated.values())} changed, "
+                    f"{sum(len(errors) for errors in failures.values())} invalid "
+                    f"({total / elapsed if elapsed else 0:,.0f} details/s)"
+                )
+        self._report(checked, updated, failures, options["dry_run"])
+
+    def _iter_details(self, checked: Counter, chunk_size: int):
+        """Stream ``(fdc_id, data_type, data)`` rows through a server-side cursor."""
+        for fdc_id, data_type, data in (
+            FoodItemDetail.objects.order_by("pk")
+            .values_list("food_item_id", "food_item__data_type", "data")
+            .iterator(chunk_size=chunk_size)
+        ):
+            checked[data_type] += 1
+            yield fdc_id, data_type, bytes(data)
+
+    def _write(self, changed) -> None:
+        with transaction.atomic():
+            FoodItemDetail.objects.bulk_update(
+                [
+                    FoodItemDetail(
+                        food_item_id=detail.fdc_id, data=detail.data, size=detail.size
+                    )
+                    for detail in changed
+                ],
+                ["data", "size"],
+            )
+            replace_food_nutrient_rows(
+                {detail.fdc_id: detail.nutrients for detail in changed}
+            )
+            FoodItem.objects.filter(
+                fdc_id__in=[detail.fdc_id for detail in changed]
+            ).update(
+                food_category=Case(
+                    *(
+                        When(fdc_id=detail.fdc_id, then=Value(detail.food_category))
+                        for detail in changed
+                    ),
+                    output_field=CharField(),
+                )
+            )
+
+    def _report(self, checked, updated, failures, dry_run: bool) -> None:
+        for data_type in sorted(checked):
+            errors = failures.get(data_type, [])
+            self.stdout.write(
+                f"{data_type}: {checked[data_type]} checked, {updated[data_type]} "
+                f"{'would change' if dry_run else 'changed'}, {len(errors)} invalid"
+            )
+            for fdc_id, error in errors[:MAX_REPORTED_ERRORS]:
+                self.stdout.write(f"  FDC ID {fdc_id}: {error}")
+            if len(errors) > MAX_REPORTED_ERRORS:
+                self.stdout.write(f"  ... and {len(errors) - MAX_REPORTED_ERRORS} more")
+        if any(failures.values()):
+            self.stdout.write(
+                self.style.WARNING("Revalidation finished with invalid details")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("Revalidation complete"))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0003_fooditem_error_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FoodSyncState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "data_type",
+                    models.CharField(
+                        choices=[
+                            ("Foundation", "Foundation"),
+                            ("SR Legacy", "SR Legacy"),
+                            ("Survey (FNDDS)", "Survey (FNDDS)"),
+                            ("Branded", "Branded"),
+                        ],
+                        max_length=20,
+                        unique=True,
+                    ),
+                ),
+                ("high_water_mark", models.DateField(blank=True, null=True)),
+                ("last_synced_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="fooditem",
+            name="content_hash",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
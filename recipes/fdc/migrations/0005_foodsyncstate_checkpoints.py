@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0004_fooditem_content_hash_foodsyncstate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="foodsyncstate",
+            name="items_per_second",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="foodsyncstate",
+            name="items_processed",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="foodsyncstate",
+            name="last_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="foodsyncstate",
+            name="last_page",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="foodsyncstate",
+            name="run_high_water_mark",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="foodsyncstate",
+            name="run_id",
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="foodsyncstate",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="foodsyncstate",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("idle", "Idle"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="idle",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="foodsyncstate",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
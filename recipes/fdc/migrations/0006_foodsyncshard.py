@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0005_foodsyncstate_checkpoints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FoodSyncShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("run_id", models.UUIDField()),
+                ("first_page", models.IntegerField()),
+                ("last_page", models.IntegerField(blank=True, null=True)),
+                ("committed_page", models.IntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("idle", "Idle"),
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="idle",
+                        max_length=20,
+                    ),
+                ),
+                ("items_processed", models.IntegerField(default=0)),
+                ("newest_published", models.DateField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "state",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shards",
+                        to="fdc.foodsyncstate",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["first_page"],
+            },
+        ),
+    ]
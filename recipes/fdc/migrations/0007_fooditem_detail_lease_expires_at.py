@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0006_foodsyncshard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fooditem",
+            name="next_detail_attempt_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:49
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# DETAIL_BACKOFF_BASE and DETAIL_BACKOFF_MAX in recipes/fdc/tasks.py at the time
+# of this migration, applied as in reschedule_failed_food_details (recipes/fdc/sync.py).
+DETAIL_BACKOFF_BASE = timedelta(hours=1)
+DETAIL_BACKOFF_MAX = timedelta(days=7)
+
+
+def schedule_existing_items(apps, schema_editor):
+    FoodItem = apps.get_model("fdc", "FoodItem")
+    FoodItem.objects.filter(ingredient__isnull=False).update(detail_priority=20)
+    # Items that used to be skipped after five failures are retried on the
+    # backoff schedule their error count implies.
+    now = timezone.now()
+    for error_count in (
+        FoodItem.objects.filter(error_count__gt=0)
+        .values_list("error_count", flat=True)
+        .distinct()
+    ):
+        # The exponent is clamped as MAX_BACKOFF_EXPONENT does in sync.py.
+        exponent = min(error_count - 1, 20)
+        delay = min(DETAIL_BACKOFF_MAX, DETAIL_BACKOFF_BASE * 2**exponent)
+        FoodItem.objects.filter(error_count=error_count).update(
+            next_detail_attempt_at=now + delay
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0007_fooditem_detail_lease_expires_at"),
+        ("library", "0005_remove_recipe_image_url_recipe_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fooditem",
+            name="detail_priority",
+            field=models.SmallIntegerField(
+                choices=[
+                    (0, "Background"),
+                    (10, "Recently viewed"),
+                    (20, "Linked to an ingredient"),
+                ],
+                default=0,
+            ),
+        ),
+        migrations.AddField(
+            model_name="fooditem",
+            name="last_viewed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=models.Index(
+                condition=models.Q(("detail__isnull", True)),
+                fields=["-detail_priority", "id"],
+                name="fdc_food_missing_detail_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=models.Index(
+                fields=["-detail_priority", "detail_fetch_date"],
+                name="fdc_food_detail_refresh_idx",
+            ),
+        ),
+        migrations.RunPython(schedule_existing_items, migrations.RunPython.noop),
+    ]
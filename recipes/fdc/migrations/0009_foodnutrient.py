@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0008_fooditem_detail_schedule"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FoodNutrient",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("nutrient_id", models.IntegerField()),
+                ("name", models.CharField(max_length=255)),
+                ("amount", models.FloatField(blank=True, null=True)),
+                ("unit", models.CharField(blank=True, max_length=20)),
+                (
+                    "food_item",
+                    models.ForeignKey(
+                        db_column="fdc_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="nutrients",
+                        to="fdc.fooditem",
+                        to_field="fdc_id",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["nutrient_id", "amount"],
+                        name="fdc_foodnutrient_amount_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("food_item", "nutrient_id"),
+                        name="fdc_foodnutrient_food_nutrient_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0009_foodnutrient"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FoodItemDetail",
+            fields=[
+                (
+                    "food_item",
+                    models.OneToOneField(
+                        db_column="fdc_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="detail_record",
+                        serialize=False,
+                        to="fdc.fooditem",
+                        to_field="fdc_id",
+                    ),
+                ),
+                ("data", models.BinaryField()),
+                (
+                    "size",
+                    models.IntegerField(
+                        help_text="Size of the uncompressed JSON in bytes."
+                    ),
+                ),
+            ],
+        ),
+        # The data is already zlib-compressed; stop TOAST from compressing it again.
+        migrations.RunSQL(
+            "ALTER TABLE fdc_fooditemdetail ALTER COLUMN data SET STORAGE EXTERNAL",
+            migrations.RunSQL.noop,
+        ),
+        migrations.RemoveIndex(
+            model_name="fooditem",
+            name="fdc_food_missing_detail_idx",
+        ),
+        migrations.AlterField(
+            model_name="fooditem",
+            name="detail",
+            field=models.JSONField(blank=True, db_column="detail", null=True),
+        ),
+        migrations.RenameField(
+            model_name="fooditem",
+            old_name="detail",
+            new_name="legacy_detail",
+        ),
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=models.Index(
+                condition=models.Q(("detail_fetch_date__isnull", True)),
+                fields=["-detail_priority", "id"],
+                name="fdc_food_missing_detail_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:57
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import BtreeGinExtension, TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0010_fooditemdetail"),
+    ]
+
+    operations = [
+        BtreeGinExtension(),
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="fooditem",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.SearchVector(
+                        "description", config="english", weight="A"
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "brand_name", config="english", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector", "data_type"], name="fdc_food_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    "description", name="gin_trgm_ops"
+                ),
+                name="fdc_food_description_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    "brand_name", name="gin_trgm_ops"
+                ),
+                name="fdc_food_brand_trgm_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0011_fooditem_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=models.Index(
+                fields=["description", "id"], name="fdc_food_description_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0012_fooditem_description_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fooditem",
+            name="food_category",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="fooditem",
+            index=models.Index(fields=["food_category"], name="fdc_food_category_idx"),
+        ),
+    ]
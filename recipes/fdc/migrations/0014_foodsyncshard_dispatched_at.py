@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fdc", "0013_fooditem_food_category"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="foodsyncshard",
+            name="dispatched_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="foodsyncshard",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("idle", "Idle"),
+                    ("queued", "Queued"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="idle",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="foodsyncstate",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("idle", "Idle"),
+                    ("queued", "Queued"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="idle",
+                max_length=20,
+            ),
+        ),
+    ]
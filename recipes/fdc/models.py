@@ -1,3 +1,8 @@
+import json
+import zlib
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
 
@@ -8,13 +13,209 @@ class FoodItem(models.Model):
         SURVEY_FNDDS = "Survey (FNDDS)", "Survey (FNDDS)"
         BRANDED = "Branded", "Branded"
 
+    class DetailPriority(models.IntegerChoices):
+        BACKGROUND = 0, "Background"
+        VIEWED = 10, "Recently viewed"
+        INGREDIENT = 20, "Linked to an ingredient"
+
     fdc_id = models.IntegerField(unique=True, db_index=True)
     data_type = models.CharField(max_length=20, choices=DataType.choices)
     description = models.CharField(max_length=2000)
     brand_name = models.CharField(max_length=1000, blank=True, null=True)
     detail_fetch_date = models.DateTimeField(blank=True, null=True)
-    detail = models.JSONField(blank=True, null=True)
+    # Uncompressed details saved before FoodItemDetail existed; the
+    # migrate_food_item_details command moves them over and empties this column.
+    legacy_detail = models.JSONField(blank=True, null=True, db_column="detail")
     error_count = models.IntegerField(default=0)
+    content_hash = models.CharField(max_length=64, blank=True, null=True)
+    next_detail_attempt_at = models.DateTimeField(blank=True, null=True)
+    detail_priority = models.SmallIntegerField(
+        choices=DetailPriority.choices, default=DetailPriority.BACKGROUND
+    )
+    last_viewed_at = models.DateTimeField(blank=True, null=True)
+    # FDC food category, copied out of the detail so lists can filter and facet on it.
+    food_category = models.CharField(max_length=255, blank=True, null=True)
+    search_vector = models.GeneratedField(
+        expression=SearchVector("description", weight="A", config="english")
+        + SearchVector("brand_name", weight="B", config="english"),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            # Ranked full-text search, optionally narrowed to one data type (btree_gin).
+            GinIndex(fields=["search_vector", "data_type"], name="fdc_food_search_idx"),
+            # Typo-tolerant matching on words in the description and brand (pg_trgm).
+            GinIndex(
+                OpClass("description", name="gin_trgm_ops"),
+                name="fdc_food_description_trgm_idx",
+            ),
+            GinIndex(
+                OpClass("brand_name", name="gin_trgm_ops"),
+                name="fdc_food_brand_trgm_idx",
+            ),
+            models.Index(fields=["food_category"], name="fdc_food_category_idx"),
+            # Keyset pagination order of the food list.
+            models.Index(fields=["description", "id"], name="fdc_food_description_idx"),
+            # Claim order for items that have never had their detail fetched.
+            models.Index(
+                fields=["-detail_priority", "id"],
+                name="fdc_food_missing_detail_idx",
+                condition=models.Q(detail_fetch_date__isnull=True),
+            ),
+            # Claim order for refreshing outdated details, oldest first.
+            models.Index(
+                fields=["-detail_priority", "detail_fetch_date"],
+                name="fdc_food_detail_refresh_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.description
+
+    @property
+    def detail(self):
+        """The decoded FDC detail, or ``None`` if it has not been fetched yet."""
+        detail_record = getattr(self, "detail_record", None)
+        if detail_record is not None:
+            return detail_record.get_detail()
+        return self.legacy_detail
+
+
+class FoodItemDetail(models.Model):
+    """The full FDC detail of a food, kept out of the food table as compressed JSON.
+
+    Lists and scans of ``FoodItem`` never read these rows; only a food's own
+    detail view and the projections built from it do.
+    """
+
+    food_item = models.OneToOneField(
+        FoodItem,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        to_field="fdc_id",
+        db_column="fdc_id",
+        related_name="detail_record",
+    )
+    data = models.BinaryField()
+    size = models.IntegerField(help_text="Size of the uncompressed JSON in bytes.")
+
+    def __str__(self):
+        return f"Detail of {self.food_item_id}"
+
+    @staticmethod
+    def encode(detail: dict) -> bytes:
+        """Serialize a detail to the compact JSON text stored (compressed) in ``data``."""
+        return json.dumps(detail, separators=(",", ":")).encode()
+
+    @classmethod
+    def from_detail(cls, fdc_id: int, detail: dict) -> "FoodItemDetail":
+        raw = cls.encode(detail)
+        return cls(food_item_id=fdc_id, data=zlib.compress(raw), size=len(raw))
+
+    def get_json(self) -> bytes:
+        return zlib.decompress(self.data)
+
+    def get_detail(self) -> dict:
+        return json.loads(self.get_json())
+
+
+class FoodNutrient(models.Model):
+    """One nutrient amount per 100 g of a food, projected from ``FoodItemDetail``."""
+
+    food_item = models.ForeignKey(
+        FoodItem,
+        on_delete=models.CASCADE,
+        to_field="fdc_id",
+        db_column="fdc_id",
+        related_name="nutrients",
+    )
+    nutrient_id = models.IntegerField()
+    name = models.CharField(max_length=255)
+    amount = models.FloatField(blank=True, null=True)
+    unit = models.CharField(max_length=20, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["food_item", "nutrient_id"],
+                name="fdc_foodnutrient_food_nutrient_uniq",
+            ),
+        ]
+        indexes = [
+            # Range filters and sorts on one nutrient, e.g. protein > 20 g.
+            models.Index(
+                fields=["nutrient_id", "amount"], name="fdc_foodnutrient_amount_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.food_item_id} {self.name}: {self.amount} {self.unit}"
+
+
+class FoodSyncState(models.Model):
+    class Status(models.TextChoices):
+        IDLE = "idle", "Idle"
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+
+    data_type = models.CharField(
+        max_length=20, choices=FoodItem.DataType.choices, unique=True
+    )
+    high_water_mark = models.DateField(blank=True, null=True)
+    last_synced_at = models.DateTimeField(blank=True, null=True)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.IDLE
+    )
+    run_id = models.UUIDField(blank=True, null=True)
+    last_page = models.IntegerField(default=0)
+    run_high_water_mark = models.DateField(blank=True, null=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    items_processed = models.IntegerField(default=0)
+    items_per_second = models.FloatField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.data_type} sync state"
+
+    @property
+    def resumable(self):
+        return self.run_id is not None and self.status in (
+            self.Status.RUNNING,
+            self.Status.FAILED,
+        )
+
+
+class FoodSyncShard(models.Model):
+    """A page range of a fanned-out food list sync run, checkpointed per page."""
+
+    state = models.ForeignKey(
+        FoodSyncState, on_delete=models.CASCADE, related_name="shards"
+    )
+    run_id = models.UUIDField()
+    first_page = models.IntegerField()
+    last_page = models.IntegerField(blank=True, null=True)
+    committed_page = models.IntegerField()
+    status = models.CharField(
+        max_length=20,
+        choices=FoodSyncState.Status.choices,
+        default=FoodSyncState.Status.IDLE,
+    )
+    items_processed = models.IntegerField(default=0)
+    newest_published = models.DateField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    # When the shard was last sent to the broker; it is QUEUED until a worker starts it.
+    dispatched_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["first_page"]
+
+    def __str__(self):
+        return (
+            f"{self.state.data_type} pages {self.first_page}-{self.last_page or 'end'}"
+        )
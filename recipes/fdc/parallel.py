@@ -0,0 +1,30 @@
+from collections import deque
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def bounded_map(
+    executor: Executor, fn: Callable[[T], R], iterable: Iterable[T], max_in_flight: int
+) -> Iterator[R]:
+    """Like ``executor.map`` but never reads more than ``max_in_flight`` items ahead.
+
+    ``Executor.map`` submits the whole iterable up front, which would pull an
+    entire dump file into memory; this keeps the input streaming.
+    """
+    in_flight = deque()
+    for item in iterable:
+        in_flight.append(executor.submit(fn, item))
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
@@ -0,0 +1,100 @@
+import hashlib
+import time
+from typing import Optional
+
+import redis
+
+from recipes.fdc.exceptions import FdcRateLimited
+from recipes.logging import getLogger
+from recipes.redis_client import get_redis
+
+logger = getLogger(__name__)
+
+# Refills the bucket from the Redis server clock, then takes the requested
+# tokens. Returns the seconds to wait before retrying, or 0 if tokens were taken.
+_ACQUIRE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) * 2)
+return tostring(wait)
+"""
+
+# Lowers the bucket to what the server reports as remaining for the key.
+_SYNC_SCRIPT = """
+local remaining = tonumber(ARGV[1])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens and tokens > remaining then
+    redis.call('HSET', KEYS[1], 'tokens', remaining)
+end
+return 1
+"""
+
+
+class FdcRateLimiter:
+    """Token bucket in Redis shared by every process using the same API key.
+
+    If Redis is unreachable the limiter lets requests through rather than
+    stopping all FDC traffic.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        key: str,
+        limit_per_hour: int,
+        max_wait: Optional[float] = None,
+    ) -> None:
+        self.client = client
+        self.key = key
+        self.capacity = max(1, limit_per_hour)
+        self.rate = self.capacity / 3600
+        self.max_wait = max_wait
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+        self._sync = client.register_script(_SYNC_SCRIPT)
+
+    @classmethod
+    def for_api_key(
+        cls, api_key: str, limit_per_hour: int, max_wait: Optional[float] = None
+    ) -> "FdcRateLimiter":
+        digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        return cls(get_redis(), f"fdc:ratelimit:{digest}", limit_per_hour, max_wait)
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available or ``max_wait`` runs out."""
+        waited = 0.0
+        while True:
+            try:
+                wait = float(
+                    self._acquire(keys=[self.key], args=[self.capacity, self.rate, 1])
+                )
+            except redis.RedisError as e:
+                logger.warning("Rate limiter unavailable, allowing request: %s", e)
+                return
+            if wait <= 0:
+                return
+            if self.max_wait is not None and waited + wait > self.max_wait:
+                raise FdcRateLimited(wait)
+            logger.info("FDC rate limit reached, waiting %.1fs for a token", wait)
+            time.sleep(wait)
+            waited += wait
+
+    def update_remaining(self, remaining: int) -> None:
+        """Adopt the API's own view of the remaining quota when it is lower."""
+        try:
+            self._sync(keys=[self.key], args=[remaining])
+        except redis.RedisError as e:
+            logger.warning("Could not sync rate limiter with API quota: %s", e)
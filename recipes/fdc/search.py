@@ -0,0 +1,131 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connections
+from django.db.models import BooleanField, ExpressionWrapper, F, Q
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+WORD_RE = re.compile(r"\w+")
+
+FACETS = ("data_type", "food_category", "has_detail", "has_ingredient")
+
+
+def food_search_query(term: str):
+    """Build a prefix ``tsquery`` matching every word of ``term``, or ``None``.
+
+    Only word characters reach the raw query, so user input cannot inject
+    tsquery operators.
+    """
+    words = WORD_RE.findall(term)
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words), search_type="raw", config="english"
+    )
+
+
+def search_food_items(queryset, term: str, ordered: bool = True):
+    """Narrow ``queryset`` to foods matching ``term``, best matches first if ``ordered``.
+
+    Words match by prefix through the ``search_vector`` GIN index, so results
+    fill in while the user types; misspelled words still match the
+    description or brand through the trigram indexes.
+    """
+    query = food_search_query(term)
+    if query is None:
+        return queryset
+    queryset = queryset.annotate(
+        search_rank=SearchRank(F("search_vector"), query),
+        search_similarity=TrigramWordSimilarity(term, "description"),
+    ).filter(
+        Q(search_vector=query)
+        | Q(description__trigram_word_similar=term)
+        | Q(brand_name__trigram_word_similar=term)
+    )
+    if not ordered:
+        return queryset
+    return queryset.order_by(
+        (F("search_rank") + F("search_similarity")).desc(), "description", "id"
+    )
+
+
+class FoodItemSearchFilter(BaseFilterBackend):
+    """Ranked search over food descriptions and brand names (``search_food_items``).
+
+    Results are ordered by relevance unless the request asks for an explicit
+    ``ordering``.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "").strip()
+        ordered = self.ordering_param not in request.query_params
+        return search_food_items(queryset, term, ordered=ordered)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Words to search for in the description and brand name.",
+                "schema": {"type": "string"},
+            },
+        ]
+
+
+def food_item_facets(queryset) -> dict:
+    """Count ``queryset`` per data type, food category, detail and ingredient status.
+
+    Every facet comes from one ``GROUPING SETS`` query over the filtered rows,
+    so the whole breakdown costs a single scan instead of one count per value.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(
+            has_detail=ExpressionWrapper(
+                Q(detail_fetch_date__isnull=False), output_field=BooleanField()
+            ),
+            has_ingredient=ExpressionWrapper(
+                Q(ingredient__isnull=False), output_field=BooleanField()
+            ),
+        )
+        .values(*FACETS)
+    )
+    sql, params = rows.query.sql_with_params()
+    columns = ", ".join(FACETS)
+    grouping_sets = ", ".join(f"({facet})" for facet in FACETS)
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f"SELECT {columns}, GROUPING({columns}), COUNT(*) FROM ({sql}) AS foods "
+            f"GROUP BY GROUPING SETS ({grouping_sets}, ())",
+            params,
+        )
+        results = cursor.fetchall()
+
+    # GROUPING() sets one bit per column left out of the row's grouping set,
+    # the first column being the most significant.
+    all_bits = (1 << len(FACETS)) - 1
+    facet_bits = {
+        all_bits ^ (1 << (len(FACETS) - 1 - index)): facet
+        for index, facet in enumerate(FACETS)
+    }
+    facets = {facet: [] for facet in FACETS}
+    total = 0
+    for row in results:
+        grouping, count = row[-2], row[-1]
+        if grouping == all_bits:
+            total = count
+            continue
+        facet = facet_bits[grouping]
+        facets[facet].append({"value": row[FACETS.index(facet)], "count": count})
+    for values in facets.values():
+        values.sort(key=lambda value: (-value["count"], str(value["value"])))
+    return {"count": total, "facets": facets}
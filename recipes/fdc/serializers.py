@@ -1,9 +1,12 @@
 from rest_framework import serializers
 
-from recipes.fdc.models import FoodItem
+from recipes.fdc.models import FoodItem, FoodSyncShard, FoodSyncState
 
 
 class FoodItemListSerializer(serializers.ModelSerializer):
+    # Only present when the list is filtered by a nutrient.
+    nutrient_amount = serializers.FloatField(read_only=True)
+
     class Meta:
         model = FoodItem
         fields = [
@@ -12,8 +15,10 @@ class FoodItemListSerializer(serializers.ModelSerializer):
             "description",
             "brand_name",
             "data_type",
+            "food_category",
             "detail_fetch_date",
             "ingredient",
+            "nutrient_amount",
         ]
 
 
@@ -26,7 +31,62 @@ class FoodItemDetailSerializer(serializers.ModelSerializer):
             "description",
             "brand_name",
             "data_type",
+            "food_category",
             "detail_fetch_date",
             "detail",
             "ingredient",
         ]
+
+
+class FoodItemPassthroughSerializer(serializers.ModelSerializer):
+    """Every detail field except ``detail``, which the view splices in as raw JSON.
+
+    ``detail_fetch_date`` is included, so the rendered fields also key the
+    response ETag.
+    """
+
+    class Meta:
+        model = FoodItem
+        fields = [
+            field for field in FoodItemDetailSerializer.Meta.fields if field != "detail"
+        ]
+
+
+class FoodSyncShardSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FoodSyncShard
+        fields = [
+            "first_page",
+            "last_page",
+            "committed_page",
+            "status",
+            "items_processed",
+            "last_error",
+            "dispatched_at",
+            "updated_at",
+        ]
+
+
+class FoodSyncStateSerializer(serializers.ModelSerializer):
+    shards = serializers.SerializerMethodField()
+
+    def get_shards(self, obj):
+        shards = obj.shards.filter(run_id=obj.run_id)
+        return FoodSyncShardSerializer(shards, many=True).data
+
+    class Meta:
+        model = FoodSyncState
+        fields = [
+            "data_type",
+            "status",
+            "run_id",
+            "last_page",
+            "items_processed",
+            "items_per_second",
+            "started_at",
+            "last_synced_at",
+            "high_water_mark",
+            "last_error",
+            "updated_at",
+            "shards",
+        ]
@@ -0,0 +1,55 @@
+from constance.signals import config_updated
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from recipes.config import invalidate_config
+from recipes.fdc.models import FoodItem
+from recipes.logging import getLogger
+
+logger = getLogger(__name__)
+
+
+@receiver(pre_save, sender="library.Ingredient")
+def remember_ingredient_food_item(sender, instance, **kwargs):
+    """Note the food item an ingredient linked to before this save."""
+    instance._previous_fdc_food_item_id = (
+        sender._default_manager.filter(pk=instance.pk)
+        .values_list("fdc_food_item_id", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender="library.Ingredient")
+@receiver(post_delete, sender="library.Ingredient")
+def update_ingredient_detail_priority(sender, instance, **kwargs):
+    """Refresh details of food items linked to ingredients ahead of everything else.
+
+    Only the food items this save or delete linked or unlinked are touched.
+    """
+    if kwargs.get("signal") is post_save:
+        linked = instance.fdc_food_item_id
+        unlinked = getattr(instance, "_previous_fdc_food_item_id", None)
+    else:
+        linked, unlinked = None, instance.fdc_food_item_id
+    if unlinked and unlinked != linked:
+        # The link is one-to-one, so no other ingredient can still hold this item.
+        FoodItem.objects.filter(
+            pk=unlinked, detail_priority=FoodItem.DetailPriority.INGREDIENT
+        ).update(detail_priority=FoodItem.DetailPriority.BACKGROUND)
+    if linked and linked != unlinked:
+        promoted = (
+            FoodItem.objects.filter(pk=linked)
+            .exclude(detail_priority=FoodItem.DetailPriority.INGREDIENT)
+            .update(detail_priority=FoodItem.DetailPriority.INGREDIENT)
+        )
+        if promoted:
+            logger.debug("Raised detail priority of food item %s", linked)
+
+
+@receiver(config_updated)
+def broadcast_config_update(sender, key, **kwargs):
+    """Make every process reload its config snapshot after a Constance value is saved."""
+    invalidate_config()
+    logger.info("Config value %s changed, invalidated config snapshots", key)
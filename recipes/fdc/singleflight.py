@@ -0,0 +1,94 @@
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+import redis
+
+from recipes.logging import getLogger
+from recipes.redis_client import get_redis
+
+logger = getLogger(__name__)
+
+# Deletes the lock only if it still holds this caller's token, so a leader
+# whose lock expired cannot release the next leader's lock.
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesces concurrent work on the same key across processes.
+
+    The first caller to take a key's Redis lock does the work while the others
+    wait for the lock to be released and then read what it stored. If Redis
+    is unreachable every caller does the work itself.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        prefix: str,
+        lock_timeout: float,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    def _lock_key(self, key) -> str:
+        return f"{self.prefix}:{key}"
+
+    @contextmanager
+    def lead(self, key) -> Iterator[bool]:
+        """Yield whether this caller should do the work for ``key``."""
+        lock_key = self._lock_key(key)
+        token = uuid.uuid4().hex
+        try:
+            acquired = bool(
+                self.client.set(
+                    lock_key, token, nx=True, px=int(self.lock_timeout * 1000)
+                )
+            )
+        except redis.RedisError as e:
+            logger.warning(
+                "Single-flight lock unavailable, not coalescing %s: %s", lock_key, e
+            )
+            yield True
+            return
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    self._release(keys=[lock_key], args=[token])
+                except redis.RedisError as e:
+                    logger.warning(
+                        "Could not release single-flight lock %s: %s", lock_key, e
+                    )
+
+    def wait(self, key, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for the leader of ``key`` to finish."""
+        lock_key = self._lock_key(key)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if not self.client.exists(lock_key):
+                    return True
+            except redis.RedisError as e:
+                logger.warning("Could not check single-flight lock %s: %s", lock_key, e)
+                return False
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+
+def get_detail_single_flight(timeout: float) -> SingleFlight:
+    # The lock outlives the leader's request timeout so followers never take
+    # over from a leader that is still waiting on FDC.
+    return SingleFlight(get_redis(), "fdc:detail:fetch", lock_timeout=timeout * 2)
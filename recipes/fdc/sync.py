@@ -0,0 +1,310 @@
+import hashlib
+import json
+import zlib
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from recipes.fdc.api import FoodDetail, parse_food_detail
+from recipes.fdc.models import FoodItem, FoodItemDetail, FoodNutrient
+from recipes.fdc.response_models import AbridgedFoodItem
+from recipes.logging import getLogger
+from recipes.metrics import fdc_items_synced
+
+logger = getLogger(__name__)
+
+ABRIDGED_FIELDS = ["data_type", "description", "brand_name", "content_hash"]
+
+# 2**20 times any sensible backoff base is already past any sensible cap.
+MAX_BACKOFF_EXPONENT = 20
+
+
+class UpsertCounts(NamedTuple):
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+class RevalidatedDetail(NamedTuple):
+    fdc_id: int
+    data_type: str
+    data: bytes
+    size: int
+    food_category: Optional[str]
+    nutrients: list[tuple[int, str, Optional[float], str]]
+
+
+def content_hash(food_item: AbridgedFoodItem) -> str:
+    """Hash of the abridged fields that a list sync would write."""
+    fields = (
+        food_item.dataType,
+        food_item.description,
+        food_item.brandOwner or "",
+        food_item.publicationDate or "",
+    )
+    return hashlib.sha256("\x1f".join(fields).encode()).hexdigest()
+
+
+def parse_publication_date(value: Optional[str]) -> Optional[date]:
+    """Parse FDC publication dates, which come as ``2024-10-31`` or ``10/31/2024``."""
+    if not value:
+        return None
+    for date_format in ("%Y-%m-%d", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def upsert_food_items(food_items: list[AbridgedFoodItem]) -> UpsertCounts:
+    """Insert or update one page of abridged food items with a single upsert.
+
+    Rows whose stored content hash matches are left untouched.
+    """
+    rows = {food_item.fdcId: food_item for food_item in food_items}
+    hashes = {fdc_id: content_hash(food_item) for fdc_id, food_item in rows.items()}
+    existing = dict(
+        FoodItem.objects.filter(fdc_id__in=rows).values_list("fdc_id", "content_hash")
+    )
+    changed = [
+        FoodItem(
+            fdc_id=fdc_id,
+            data_type=food_item.dataType,
+            description=food_item.description,
+            brand_name=food_item.brandOwner,
+            content_hash=hashes[fdc_id],
+        )
+        for fdc_id, food_item in rows.items()
+        if existing.get(fdc_id) != hashes[fdc_id]
+    ]
+    if changed:
+        FoodItem.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=["fdc_id"],
+            update_fields=ABRIDGED_FIELDS,
+        )
+    inserted = sum(1 for fdc_id in rows if fdc_id not in existing)
+    counts = UpsertCounts(
+        inserted=inserted,
+        updated=len(changed) - inserted,
+        unchanged=len(rows) - len(changed),
+    )
+    for outcome, count in counts._asdict().items():
+        fdc_items_synced.inc(count, kind="list", outcome=outcome)
+    return counts
+
+
+def save_food_details(food_details: list[FoodDetail]) -> None:
+    """Store fetched details in one transaction, creating unknown food items.
+
+    The details go to ``FoodItemDetail``; the food rows only record when
+    they were fetched.
+    """
+    if not food_details:
+        return
+    now = timezone.now()
+    details = {
+        food_detail.fdcId: food_detail.model_dump() for food_detail in food_details
+    }
+    with transaction.atomic():
+        existing = FoodItem.objects.only("id", "fdc_id").in_bulk(
+            [food_detail.fdcId for food_detail in food_details], field_name="fdc_id"
+        )
+        to_update = []
+        to_create = []
+        for food_detail in food_details:
+            item = existing.get(food_detail.fdcId)
+            if item is None:
+                item = FoodItem(
+                    fdc_id=food_detail.fdcId,
+                    data_type=food_detail.dataType or "",
+                    description=food_detail.description,
+                    brand_name=getattr(food_detail, "brandOwner", None),
+                )
+                to_create.append(item)
+            else:
+                to_update.append(item)
+            item.legacy_detail = None
+            item.food_category = extract_food_category(details[food_detail.fdcId])
+            item.detail_fetch_date = now
+            item.error_count = 0
+            item.next_detail_attempt_at = None
+        FoodItem.objects.bulk_update(
+            to_update,
+            [
+                "legacy_detail",
+                "food_category",
+                "detail_fetch_date",
+                "error_count",
+                "next_detail_attempt_at",
+            ],
+        )
+        FoodItem.objects.bulk_create(to_create)
+        FoodItemDetail.objects.bulk_create(
+            [
+                FoodItemDetail.from_detail(fdc_id, detail)
+                for fdc_id, detail in details.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["food_item"],
+            update_fields=["data", "size"],
+        )
+        replace_food_nutrients(details)
+    fdc_items_synced.inc(len(to_update), kind="detail", outcome="updated")
+    fdc_items_synced.inc(len(to_create), kind="detail", outcome="inserted")
+    logger.debug(
+        "Saved %s updated and %s new food details", len(to_update), len(to_create)
+    )
+
+
+def extract_food_category(detail: dict) -> Optional[str]:
+    """Return the food category of a stored detail, whichever data type it is."""
+    category = (
+        (detail.get("foodCategory") or {}).get("description")
+        or detail.get("brandedFoodCategory")
+        or (detail.get("wweiaFoodCategory") or {}).get("wweiaFoodCategoryDescription")
+    )
+    return category[:255] if category else None
+
+
+def extract_food_nutrients(detail: dict) -> list[tuple[int, str, Optional[float], str]]:
+    """Return ``(nutrient_id, name, amount, unit)`` for each nutrient in a stored detail.
+
+    Repeated nutrients keep their first amount, matching how FDC lists them.
+    """
+    nutrients = {}
+    for food_nutrient in detail.get("foodNutrients") or []:
+        nutrient = food_nutrient.get("nutrient") or {}
+        nutrient_id = nutrient.get("id")
+        if nutrient_id is None or nutrient_id in nutrients:
+            continue
+        nutrients[nutrient_id] = (
+            nutrient_id,
+            nutrient.get("name") or "",
+            food_nutrient.get("amount"),
+            nutrient.get("unitName") or "",
+        )
+    return list(nutrients.values())
+
+
+def replace_food_nutrients(details: dict[int, dict], batch_size: int = 5000) -> int:
+    """Rebuild the ``FoodNutrient`` rows of the given ``{fdc_id: detail}`` foods."""
+    return replace_food_nutrient_rows(
+        {
+            fdc_id: extract_food_nutrients(detail) if detail else []
+            for fdc_id, detail in details.items()
+        },
+        batch_size=batch_size,
+    )
+
+
+def replace_food_nutrient_rows(
+    nutrients: dict[int, list[tuple[int, str, Optional[float], str]]],
+    batch_size: int = 5000,
+) -> int:
+    """Replace the ``FoodNutrient`` rows of each food with already extracted rows."""
+    FoodNutrient.objects.filter(food_item_id__in=nutrients.keys()).delete()
+    rows = [
+        FoodNutrient(
+            food_item_id=fdc_id,
+            nutrient_id=nutrient_id,
+            name=name,
+            amount=amount,
+            unit=unit,
+        )
+        for fdc_id, food_nutrients in nutrients.items()
+        for nutrient_id, name, amount, unit in food_nutrients
+    ]
+    FoodNutrient.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def revalidate_detail_chunk(
+    rows: list[tuple[int, str, bytes]],
+) -> tuple[list[RevalidatedDetail], list[tuple[int, str, str]]]:
+    """Re-run the response models over stored details, for a worker process.
+
+    ``rows`` are ``(fdc_id, data_type, compressed detail)``. Returns the details
+    whose validated form differs from what is stored, re-encoded along with
+    their projections, and ``(fdc_id, data_type, error)`` for each detail that
+    no longer validates. Touches no database, so it can run in a process pool.
+    """
+    changed = []
+    failed = []
+    for fdc_id, data_type, data in rows:
+        try:
+            raw = zlib.decompress(data)
+            stored = json.loads(raw)
+            if not stored.get("dataType"):
+                stored["dataType"] = data_type
+            detail = parse_food_detail(stored).model_dump()
+        except Exception as e:
+            failed.append((fdc_id, data_type, " ".join(str(e).split())))
+            continue
+        encoded = FoodItemDetail.encode(detail)
+        if encoded == raw:
+            continue
+        changed.append(
+            RevalidatedDetail(
+                fdc_id=fdc_id,
+                data_type=data_type,
+                data=zlib.compress(encoded),
+                size=len(encoded),
+                food_category=extract_food_category(detail),
+                nutrients=extract_food_nutrients(detail),
+            )
+        )
+    return changed, failed
+
+
+def claim_food_details(
+    due: Q, order_by: list[str], limit: int, lease_duration: timezone.timedelta
+) -> list[int]:
+    """Lease up to ``limit`` due food items to the caller and return their FDC IDs.
+
+    An item is claimable once its ``next_detail_attempt_at`` has passed. The
+    claim pushes it forward by ``lease_duration``; rows locked by a
+    concurrent claim are skipped rather than waited on, so every item is in
+    flight on at most one worker.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        fdc_ids = list(
+            FoodItem.objects.filter(due)
+            .filter(
+                Q(next_detail_attempt_at__isnull=True)
+                | Q(next_detail_attempt_at__lte=now)
+            )
+            .order_by(*order_by)
+            .select_for_update(skip_locked=True)
+            .values_list("fdc_id", flat=True)[:limit]
+        )
+        FoodItem.objects.filter(fdc_id__in=fdc_ids).update(
+            next_detail_attempt_at=now + lease_duration
+        )
+    return fdc_ids
+
+
+def release_food_details(fdc_ids: list[int]) -> None:
+    """Give leased items back to the queue without recording an attempt."""
+    FoodItem.objects.filter(fdc_id__in=fdc_ids).update(next_detail_attempt_at=None)
+
+
+def reschedule_failed_food_details(
+    fdc_ids: set[int], backoff_base: timezone.timedelta, backoff_max: timezone.timedelta
+) -> int:
+    """Count a failed attempt and back each item off exponentially in its error count."""
+    now = timezone.now()
+    items = list(FoodItem.objects.filter(fdc_id__in=fdc_ids).only("id", "error_count"))
+    for item in items:
+        item.error_count += 1
+        # Clamped so items that keep failing cannot overflow the timedelta.
+        exponent = min(item.error_count - 1, MAX_BACKOFF_EXPONENT)
+        item.next_detail_attempt_at = now + min(backoff_max, backoff_base * 2**exponent)
+    FoodItem.objects.bulk_update(items, ["error_count", "next_detail_attempt_at"])
+    return len(items)
@@ -1,96 +1,606 @@
-from celery import shared_task
-from constance import config
-from django.db.models import F
+import time
+import uuid
+
+from celery import chord, shared_task
+from django.db import transaction
+from django.db.models import Max, Q, Sum
 from django.utils import timezone
 
+from recipes.config import config
 from recipes.fdc import get_api
-from recipes.fdc.api import FoodDataTypes
-from recipes.fdc.models import FoodItem
-from recipes.logging import getLogger
+from recipes.fdc.api import MAX_FOODS_PER_REQUEST, FoodDataTypes, parse_food_detail
+from recipes.fdc.circuit import get_circuit_breaker
+from recipes.fdc.exceptions import FdcUnavailable
+from recipes.fdc.models import FoodItem, FoodSyncShard, FoodSyncState
+from recipes.fdc.sync import (
+    UpsertCounts,
+    claim_food_details,
+    parse_publication_date,
+    release_food_details,
+    reschedule_failed_food_details,
+    save_food_details,
+    upsert_food_items,
+)
+from recipes.logging import SAMPLED, getLogger
 
 logger = getLogger(__name__)
 
+# Detail tasks wait briefly for a rate limit token, then reschedule themselves
+# instead of holding a worker slot until the hourly quota refills. The same
+# retry covers an open circuit breaker, so outages never count against items.
+DETAIL_RATE_LIMIT_WAIT = 30
+DETAIL_RATE_LIMIT_RETRIES = 24
+
+# Claimed food items stay leased to one worker for this long; it covers a batch
+# waiting for a rate limit token plus every transport retry.
+DETAIL_LEASE_DURATION = timezone.timedelta(minutes=10)
+
+# Failed detail fetches are retried after 1h, 2h, 4h, ... up to a week.
+DETAIL_BACKOFF_BASE = timezone.timedelta(hours=1)
+DETAIL_BACKOFF_MAX = timezone.timedelta(days=7)
+
+# A drainer hands over to a fresh task after this long, so no run holds a worker
+# slot for hours or outlives the broker's visibility timeout on a large backlog.
+DETAIL_DRAIN_RUN_TIME = timezone.timedelta(minutes=5)
+
+# Viewed food items keep their raised detail priority for this long.
+DETAIL_VIEWED_PRIORITY_FOR = timezone.timedelta(days=7)
+
+# A running sync that has not checkpointed for this long is assumed dead and resumed.
+SYNC_STALE_AFTER = timezone.timedelta(minutes=15)
+# Shards still waiting in the broker are left alone however backed up the queue
+# is, unless they were dispatched this long ago and their message was lost.
+SYNC_QUEUED_EXPIRE_AFTER = timezone.timedelta(days=1)
+
 
 @shared_task
-def fetch_food_items():
-    logger.info("Starting fetch_food_items task")
-    api = get_api()
-    total_processed = 0
+def fetch_food_items(full: bool = False):
+    """Sync the abridged food list for every enabled data type.
+
+    Each data type gets its own task so they run on separate workers.
+    Incremental runs walk a data type newest-first and stop at the first page
+    that is entirely older than the stored high-water mark and unchanged;
+    ``full`` runs and first syncs are split into page-range shards.
+    """
+    logger.info("Starting fetch_food_items task (full=%s)", full)
     for data_type_str in config.FDC_ENABLED_DATA_TYPES:
-        logger.info(f"Fetching food items for data type: {data_type_str}")
-        data_type = FoodDataTypes(data_type_str)
-        data_type_count = 0
+        sync_food_item_data_type.delay(data_type_str, full)
+    logger.info(
+        "fetch_food_items queued syncs for %s data types",
+        len(config.FDC_ENABLED_DATA_TYPES),
+    )
+
+
+@shared_task
+def sync_food_item_data_type(data_type_str: str, full: bool = False):
+    """Sync one data type, fanning full walks out as a chord of page-range shards.
+
+    The shards walk the list in ``fdcId`` order so page boundaries stay put
+    while they run; the last shard is open-ended and picks up foods added
+    since the page count was taken. ``finish_food_item_sync`` records the
+    totals once every shard has completed.
+    """
+    data_type = FoodDataTypes(data_type_str)
+    logger.info("Fetching food items for data type: %s", data_type_str)
+    state = _claim_sync_run(data_type)
+    if state is None:
+        return 0
+    api = get_api()
+    try:
+        shards = list(state.shards.filter(run_id=state.run_id))
+        if (
+            not shards
+            and state.last_page == 0
+            and (full or state.high_water_mark is None)
+        ):
+            shards = _create_sync_shards(api, state)
+    except Exception as e:
+        _fail_sync_run(state, str(e))
+        raise
+
+    if not shards:
         try:
-            for instance in api.get_food_list(data_type):
-                logger.debug(f"Processing food item with FDC ID: {instance.fdcId}")
-                FoodItem.objects.update_or_create(
-                    fdc_id=instance.fdcId,
-                    defaults=dict(
-                        data_type=instance.dataType,
-                        description=instance.description,
-                        brand_name=instance.brandOwner,
-                    ),
-                )
-                data_type_count += 1
-                total_processed += 1
-                if data_type_count % 100 == 0:
-                    logger.info(f"Processed {data_type_count} items for {data_type_str}")
-            logger.info(f"Completed {data_type_str}: {data_type_count} items processed")
+            data_type_count = _sync_data_type(api, state, full)
         except Exception as e:
-            logger.error(f"Error fetching food items for {data_type_str}: {e}", exc_info=True)
-    logger.info(f"fetch_food_items task completed. Total items processed: {total_processed}")
+            logger.error(
+                "Error fetching food items for %s: %s", data_type_str, e, exc_info=True
+            )
+            return 0
+        _log_api_stats(api)
+        return data_type_count
+
+    pending = [
+        shard for shard in shards if shard.status != FoodSyncState.Status.COMPLETED
+    ]
+    if not pending:
+        finish_food_item_sync.delay(state.id, str(state.run_id))
+        return 0
+    logger.info(
+        "Dispatching %s of %s page-range shards for %s sync run %s",
+        len(pending),
+        len(shards),
+        data_type_str,
+        state.run_id,
+    )
+    now = timezone.now()
+    FoodSyncShard.objects.filter(pk__in=[shard.pk for shard in pending]).update(
+        status=FoodSyncState.Status.QUEUED, dispatched_at=now, updated_at=now
+    )
+    try:
+        chord(fetch_food_item_shard.s(shard.id) for shard in pending)(
+            finish_food_item_sync.si(state.id, str(state.run_id))
+        )
+    except Exception as e:
+        # Nothing was queued, so the shards must not hold the run off.
+        FoodSyncShard.objects.filter(pk__in=[shard.pk for shard in pending]).update(
+            status=FoodSyncState.Status.IDLE, dispatched_at=None
+        )
+        _fail_sync_run(state, str(e))
+        raise
+    return 0
+
+
+def _log_api_stats(api) -> None:
+    logger.info("FDC transport stats: %s", api.transport.get_stats())
+    if api.cache:
+        logger.info("FDC response cache stats: %s", api.cache.get_stats())
+
+
+def _claim_sync_run(data_type: FoodDataTypes):
+    """Mark the data type's sync as running, resuming an interrupted run if any.
+
+    Returns ``None`` when another worker is still making progress on it, or
+    shards of the run are still queued. Only shards that started and then
+    stopped checkpointing are taken over.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        state, _ = FoodSyncState.objects.get_or_create(data_type=data_type.value)
+        state = FoodSyncState.objects.select_for_update().get(pk=state.pk)
+        run_shards = state.shards.filter(run_id=state.run_id)
+        queued = run_shards.filter(
+            status=FoodSyncState.Status.QUEUED,
+            dispatched_at__gt=now - SYNC_QUEUED_EXPIRE_AFTER,
+        ).count()
+        if queued:
+            logger.warning(
+                "%s %s sync shards (run %s) are still queued, skipping to avoid running them twice",
+                queued,
+                data_type.value,
+                state.run_id,
+            )
+            return None
+        running_shards = run_shards.filter(status=FoodSyncState.Status.RUNNING)
+        last_activity = max(
+            [state.updated_at, *running_shards.values_list("updated_at", flat=True)]
+        )
+        if (
+            state.status == FoodSyncState.Status.RUNNING or running_shards.exists()
+        ) and last_activity > now - SYNC_STALE_AFTER:
+            logger.warning(
+                "A %s sync (run %s) checkpointed at %s, skipping to avoid running it twice",
+                data_type.value,
+                state.run_id,
+                last_activity,
+            )
+            return None
+        if state.resumable:
+            logger.info(
+                "Resuming %s sync run %s after page %s",
+                data_type.value,
+                state.run_id,
+                state.last_page,
+            )
+        else:
+            state.shards.all().delete()
+            state.run_id = uuid.uuid4()
+            state.last_page = 0
+            state.run_high_water_mark = state.high_water_mark
+            state.started_at = now
+            state.items_processed = 0
+            state.items_per_second = None
+        state.status = FoodSyncState.Status.RUNNING
+        state.last_error = ""
+        state.save()
+    return state
+
+
+def _fail_sync_run(state: FoodSyncState, error: str) -> None:
+    state.status = FoodSyncState.Status.FAILED
+    state.last_error = error
+    state.save(update_fields=["status", "last_error", "updated_at"])
+
+
+def _create_sync_shards(api, state: FoodSyncState) -> list[FoodSyncShard]:
+    data_type = FoodDataTypes(state.data_type)
+    page_count = api.count_food_list_pages(data_type, sort_by="fdcId", sort_order="asc")
+    shard_pages = max(1, config.FDC_SYNC_SHARD_PAGES)
+    first_pages = range(1, max(page_count, 1) + 1, shard_pages)
+    shards = [
+        FoodSyncShard(
+            state=state,
+            run_id=state.run_id,
+            first_page=first_page,
+            last_page=(
+                first_page + shard_pages - 1 if first_page != first_pages[-1] else None
+            ),
+            committed_page=first_page - 1,
+        )
+        for first_page in first_pages
+    ]
+    logger.info(
+        "Splitting %s %s pages into %s shards of %s pages",
+        page_count,
+        data_type.value,
+        len(shards),
+        shard_pages,
+    )
+    return FoodSyncShard.objects.bulk_create(shards)
 
 
 @shared_task
-def fetch_food_detail(fdc_id: int):
+def fetch_food_item_shard(shard_id: int):
+    """Walk one page range of a sync run, committing a checkpoint with every page."""
+    shard = FoodSyncShard.objects.select_related("state").filter(pk=shard_id).first()
+    if shard is None:
+        logger.warning(
+            "Sync shard %s no longer exists, its run was restarted", shard_id
+        )
+        return 0
+    if shard.status == FoodSyncState.Status.COMPLETED:
+        return shard.items_processed
+    data_type = FoodDataTypes(shard.state.data_type)
+    shard.status = FoodSyncState.Status.RUNNING
+    shard.last_error = ""
+    shard.save(update_fields=["status", "last_error", "updated_at"])
+
     api = get_api()
-    logger.info(f"Starting fetch_food_detail for FDC ID: {fdc_id}")
+    totals = UpsertCounts(0, 0, 0)
     try:
-        food_detail = api.get_food_by_fdc_id(fdc_id)
-        logger.debug(f"Successfully fetched detail for FDC ID {fdc_id}")
-        FoodItem.objects.update_or_create(
-            fdc_id=fdc_id,
-            defaults=dict(
-                detail_fetch_date=timezone.now(),
-                detail=food_detail.model_dump(),
-            ),
+        pages = api.get_food_list_pages(
+            data_type,
+            prefetch=config.FDC_SYNC_PREFETCH_PAGES,
+            start_page=shard.committed_page + 1,
+            end_page=shard.last_page,
+            sort_by="fdcId",
+            sort_order="asc",
+        )
+        for page_number, instances in pages:
+            newest_published = max(
+                filter(
+                    None, (parse_publication_date(i.publicationDate) for i in instances)
+                ),
+                default=None,
+            )
+            with transaction.atomic():
+                counts = upsert_food_items(instances)
+                shard.committed_page = page_number
+                shard.items_processed += len(instances)
+                if newest_published and (
+                    shard.newest_published is None
+                    or newest_published > shard.newest_published
+                ):
+                    shard.newest_published = newest_published
+                shard.save(
+                    update_fields=[
+                        "committed_page",
+                        "items_processed",
+                        "newest_published",
+                        "updated_at",
+                    ]
+                )
+            totals = UpsertCounts(
+                *(total + count for total, count in zip(totals, counts))
+            )
+            logger.debug(
+                "Processed %s page %s of shard %s",
+                data_type.value,
+                page_number,
+                shard,
+                extra=SAMPLED,
+            )
+    except Exception as e:
+        logger.error("Error fetching %s: %s", shard, e, exc_info=True)
+        shard.status = FoodSyncState.Status.FAILED
+        shard.last_error = str(e)
+        shard.save(update_fields=["status", "last_error", "updated_at"])
+        FoodSyncState.objects.filter(pk=shard.state_id, run_id=shard.run_id).update(
+            status=FoodSyncState.Status.FAILED,
+            last_error=f"{shard}: {e}",
+            updated_at=timezone.now(),
         )
-        logger.info(f"Successfully saved detail for FDC ID {fdc_id}")
+        raise
+
+    shard.status = FoodSyncState.Status.COMPLETED
+    shard.save(update_fields=["status", "updated_at"])
+    logger.info(
+        "Completed %s: %s inserted, %s updated, %s unchanged",
+        shard,
+        totals.inserted,
+        totals.updated,
+        totals.unchanged,
+    )
+    _log_api_stats(api)
+    return shard.items_processed
+
+
+@shared_task
+def finish_food_item_sync(state_id: int, run_id: str):
+    """Chord callback recording the totals of a sharded sync run."""
+    with transaction.atomic():
+        state = FoodSyncState.objects.select_for_update().get(pk=state_id)
+        if str(state.run_id) != run_id:
+            logger.warning("Sync run %s was superseded by run %s", run_id, state.run_id)
+            return
+        shards = state.shards.filter(run_id=run_id)
+        if shards.exclude(status=FoodSyncState.Status.COMPLETED).exists():
+            logger.warning(
+                "%s sync run %s still has incomplete shards", state.data_type, run_id
+            )
+            return
+        totals = shards.aggregate(
+            items=Sum("items_processed"),
+            pages=Max("committed_page"),
+            newest_published=Max("newest_published"),
+        )
+        finished_at = timezone.now()
+        elapsed = (finished_at - state.started_at).total_seconds()
+        state.items_processed = totals["items"] or 0
+        state.last_page = totals["pages"] or 0
+        state.items_per_second = state.items_processed / max(elapsed, 1e-6)
+        if totals["newest_published"] and (
+            state.run_high_water_mark is None
+            or totals["newest_published"] > state.run_high_water_mark
+        ):
+            state.run_high_water_mark = totals["newest_published"]
+        state.status = FoodSyncState.Status.COMPLETED
+        state.high_water_mark = state.run_high_water_mark
+        state.last_synced_at = finished_at
+        state.save()
+    logger.info(
+        "Completed %s: %s items processed across %s shards (%.0f items/s)",
+        state.data_type,
+        state.items_processed,
+        shards.count(),
+        state.items_per_second,
+    )
+
+
+def _sync_data_type(api, state: FoodSyncState, full: bool) -> int:
+    """Walk one data type newest-first, committing a checkpoint with every page.
+
+    A run that failed or whose worker died resumes after its last committed
+    page instead of starting again at page 1.
+    """
+    data_type = FoodDataTypes(state.data_type)
+    high_water_mark = None if full else state.high_water_mark
+    data_type_count = 0
+    totals = UpsertCounts(0, 0, 0)
+    attempt_started = time.monotonic()
+    try:
+        pages = api.get_food_list_pages(
+            data_type,
+            prefetch=config.FDC_SYNC_PREFETCH_PAGES,
+            start_page=state.last_page + 1,
+            sort_by="publishedDate",
+            sort_order="desc",
+        )
+        for page_number, instances in pages:
+            page_dates = [
+                published
+                for published in (
+                    parse_publication_date(i.publicationDate) for i in instances
+                )
+                if published
+            ]
+            with transaction.atomic():
+                counts = upsert_food_items(instances)
+                data_type_count += len(instances)
+                state.last_page = page_number
+                state.items_processed += len(instances)
+                state.items_per_second = data_type_count / max(
+                    time.monotonic() - attempt_started, 1e-6
+                )
+                if page_dates and (
+                    state.run_high_water_mark is None
+                    or max(page_dates) > state.run_high_water_mark
+                ):
+                    state.run_high_water_mark = max(page_dates)
+                state.save(
+                    update_fields=[
+                        "last_page",
+                        "items_processed",
+                        "items_per_second",
+                        "run_high_water_mark",
+                        "updated_at",
+                    ]
+                )
+            totals = UpsertCounts(
+                *(total + count for total, count in zip(totals, counts))
+            )
+            logger.info(
+                "Processed page %s for %s: %s inserted, %s updated, %s unchanged (%s items so far)",
+                page_number,
+                data_type.value,
+                counts.inserted,
+                counts.updated,
+                counts.unchanged,
+                data_type_count,
+            )
+            if (
+                high_water_mark
+                and counts.unchanged == len(instances)
+                and page_dates
+                and max(page_dates) < high_water_mark
+            ):
+                logger.info(
+                    "Reached already-synced %s items published before %s at page %s, stopping "
+                    "early",
+                    data_type.value,
+                    high_water_mark,
+                    page_number,
+                )
+                break
     except Exception as e:
-        logger.error(f"Error fetching food detail for FDC ID {fdc_id}: {e}", exc_info=True)
-        updated = FoodItem.objects.filter(fdc_id=fdc_id).update(error_count=F("error_count") + 1)
+        _fail_sync_run(state, str(e))
+        raise
+
+    state.status = FoodSyncState.Status.COMPLETED
+    state.high_water_mark = state.run_high_water_mark
+    state.last_synced_at = timezone.now()
+    state.save(
+        update_fields=["status", "high_water_mark", "last_synced_at", "updated_at"]
+    )
+    logger.info(
+        "Completed %s: %s items processed, %s inserted, %s updated, %s unchanged",
+        data_type.value,
+        data_type_count,
+        totals.inserted,
+        totals.updated,
+        totals.unchanged,
+    )
+    return data_type_count
+
+
+@shared_task(bind=True, max_retries=DETAIL_RATE_LIMIT_RETRIES)
+def fetch_food_detail(self, fdc_id: int):
+    api = get_api(rate_limit_wait=DETAIL_RATE_LIMIT_WAIT)
+    logger.info("Starting fetch_food_detail for FDC ID: %s", fdc_id, extra=SAMPLED)
+    try:
+        food_detail = api.get_food_by_fdc_id(fdc_id)
+        logger.debug("Successfully fetched detail for FDC ID %s", fdc_id)
+        save_food_details([food_detail])
+        logger.info("Successfully saved detail for FDC ID %s", fdc_id, extra=SAMPLED)
+    except FdcUnavailable as e:
+        logger.info("Cannot fetch FDC ID %s now (%s), retrying", fdc_id, e)
+        raise self.retry(exc=e, countdown=e.retry_after)
+    except Exception as e:
+        logger.error(
+            "Error fetching food detail for FDC ID %s: %s", fdc_id, e, exc_info=True
+        )
+        updated = reschedule_failed_food_details(
+            {fdc_id}, DETAIL_BACKOFF_BASE, DETAIL_BACKOFF_MAX
+        )
         if updated:
-            logger.warning(f"Incremented error count for FDC ID {fdc_id}")
+            logger.warning("Incremented error count for FDC ID %s", fdc_id)
         else:
-            logger.error(f"Failed to update error count for FDC ID {fdc_id} - item may not exist")
+            logger.error(
+                "Failed to update error count for FDC ID %s - item may not exist",
+                fdc_id,
+            )
+
+
+def _refresh_food_details(api, fdc_ids: list[int]) -> tuple[int, int]:
+    """Fetch and store details for one batch, returning the saved and failed counts.
+
+    Raises ``FdcUnavailable`` when the API cannot be called right now.
+    """
+    try:
+        food_dicts = api.get_foods_by_fdc_ids(fdc_ids)
+    except FdcUnavailable:
+        raise
+    except Exception as e:
+        logger.error(
+            "Error fetching food details for FDC IDs %s: %s", fdc_ids, e, exc_info=True
+        )
+        food_dicts = []
+
+    food_details = []
+    for food_dict in food_dicts:
+        try:
+            food_details.append(parse_food_detail(food_dict))
+        except Exception as e:
+            logger.error(
+                "Invalid food detail for FDC ID %s: %s",
+                food_dict.get("fdcId"),
+                e,
+                exc_info=True,
+            )
+    save_food_details(food_details)
+
+    failed_ids = set(fdc_ids) - {food_detail.fdcId for food_detail in food_details}
+    if failed_ids:
+        updated = reschedule_failed_food_details(
+            failed_ids, DETAIL_BACKOFF_BASE, DETAIL_BACKOFF_MAX
+        )
+        logger.warning("Backed off %s of %s failed FDC IDs", updated, len(failed_ids))
+    return len(food_details), len(failed_ids)
+
+
+def _due_food_details(queue: str) -> tuple[Q, list[str]]:
+    """Return the filter and claim order for a detail queue, highest priority first."""
+    if queue == "missing":
+        return Q(detail_fetch_date__isnull=True), ["-detail_priority", "id"]
+    expiry = timezone.now() - timezone.timedelta(days=config.FDC_DETAIL_EXPIRY_DAYS)
+    return Q(detail_fetch_date__lt=expiry), ["-detail_priority", "detail_fetch_date"]
+
+
+@shared_task(bind=True, max_retries=DETAIL_RATE_LIMIT_RETRIES)
+def drain_food_detail_queue(self, queue: str):
+    """Claim and refresh batches of due food items until none are left.
+
+    Several drainers can run at once: each claims its own leased batch, so no
+    ``fdc_id`` is fetched twice. When the API is unavailable the current batch
+    is released and the task reschedules itself. After ``DETAIL_DRAIN_RUN_TIME``
+    the task queues a fresh drainer to carry on and returns.
+    """
+    api = get_api(rate_limit_wait=DETAIL_RATE_LIMIT_WAIT)
+    deadline = time.monotonic() + DETAIL_DRAIN_RUN_TIME.total_seconds()
+    saved = failed = 0
+    while True:
+        if time.monotonic() >= deadline:
+            drain_food_detail_queue.delay(queue)
+            logger.info(
+                "Draining %s food details for %s, continuing in a new task",
+                queue,
+                DETAIL_DRAIN_RUN_TIME,
+            )
+            break
+        due, order_by = _due_food_details(queue)
+        fdc_ids = claim_food_details(
+            due, order_by, MAX_FOODS_PER_REQUEST, DETAIL_LEASE_DURATION
+        )
+        if not fdc_ids:
+            break
+        try:
+            batch_saved, batch_failed = _refresh_food_details(api, fdc_ids)
+        except FdcUnavailable as e:
+            release_food_details(fdc_ids)
+            logger.info("Cannot refresh %s food details now (%s), retrying", queue, e)
+            raise self.retry(exc=e, countdown=e.retry_after)
+        saved += batch_saved
+        failed += batch_failed
+    logger.info("Drained %s food details: %s saved, %s failed", queue, saved, failed)
+
+
+def _queue_detail_drainers(queue: str) -> None:
+    if get_circuit_breaker().is_open():
+        logger.warning(
+            "FDC circuit breaker is open, not refreshing %s food details", queue
+        )
+        return
+    expired = FoodItem.objects.filter(
+        detail_priority=FoodItem.DetailPriority.VIEWED,
+        last_viewed_at__lt=timezone.now() - DETAIL_VIEWED_PRIORITY_FOR,
+    ).update(detail_priority=FoodItem.DetailPriority.BACKGROUND)
+    if expired:
+        logger.info(
+            "Lowered the detail priority of %s food items not viewed recently", expired
+        )
+    workers = max(1, config.FDC_DETAIL_WORKERS)
+    for _ in range(workers):
+        drain_food_detail_queue.delay(queue)
+    logger.info("Queued %s drainers for %s food details", workers, queue)
 
 
 @shared_task
 def fetch_missing_food_details():
     logger.info("Starting fetch_missing_food_details task")
-    missing_items = FoodItem.objects.filter(detail__isnull=True, error_count__lte=5)[
-        :1000
-    ]
-    item_count = len(missing_items)
-    logger.info(f"Found {item_count} items with missing details to process")
-    for idx, item in enumerate(missing_items, 1):
-        logger.debug(f"Queueing fetch for FDC ID: {item.fdc_id} ({idx}/{item_count})")
-        fetch_food_detail.delay(item.fdc_id)
-    logger.info(f"fetch_missing_food_details completed. Queued {item_count} tasks")
+    _queue_detail_drainers("missing")
 
 
 @shared_task
 def fetch_outdated_food_details():
     logger.info("Starting fetch_outdated_food_details task")
-    expiry_days = config.FDC_DETAIL_EXPIRY_DAYS
-    logger.info(f"Using expiry threshold of {expiry_days} days")
-    outdated_items = FoodItem.objects.filter(
-        detail_fetch_date__lt=timezone.now()
-        - timezone.timedelta(days=expiry_days)
-    )[:1000]
-    item_count = len(outdated_items)
-    logger.info(f"Found {item_count} outdated items to refresh")
-    for idx, item in enumerate(outdated_items, 1):
-        logger.debug(f"Queueing refresh for FDC ID: {item.fdc_id} ({idx}/{item_count})")
-        fetch_food_detail.delay(item.fdc_id)
-    logger.info(f"fetch_outdated_food_details completed. Queued {item_count} tasks")
+    logger.info("Using expiry threshold of %s days", config.FDC_DETAIL_EXPIRY_DAYS)
+    _queue_detail_drainers("outdated")
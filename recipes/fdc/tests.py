@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from recipes.celery import app
+from recipes.fdc.models import FoodItem, FoodSyncShard, FoodSyncState
+from recipes.fdc.serializers import FoodSyncShardSerializer
+from recipes.fdc.tasks import fetch_food_detail
+from recipes.fdc.views import FdcTasksView, FoodItemViewSet
+
+
+class InteractiveDetailFetchRoutingTests(SimpleTestCase):
+    def test_fetch_food_detail_is_routed_to_the_interactive_queue(self):
+        route = app.amqp.router.route({}, fetch_food_detail.name)
+        self.assertEqual(route["queue"].name, settings.FDC_INTERACTIVE_QUEUE)
+
+    def test_viewed_food_detail_fetch_is_published_to_the_interactive_queue(self):
+        instance = FoodItem(pk=1, fdc_id=123)
+        with (
+            mock.patch("recipes.fdc.views.claim_food_details", return_value=[123]),
+            mock.patch.object(app.amqp, "send_task_message") as send_task_message,
+        ):
+            FoodItemViewSet()._queue_detail_fetch(instance)
+        send_task_message.assert_called_once()
+        queue = send_task_message.call_args.kwargs["queue"]
+        self.assertEqual(queue.name, settings.FDC_INTERACTIVE_QUEUE)
+
+
+class FoodSyncShardSerializerTests(SimpleTestCase):
+    def test_serializes_a_shard(self):
+        shard = FoodSyncShard(
+            first_page=1,
+            last_page=50,
+            committed_page=10,
+            status=FoodSyncState.Status.RUNNING,
+            items_processed=2000,
+        )
+        data = FoodSyncShardSerializer(shard).data
+        self.assertEqual(data["committed_page"], 10)
+        self.assertEqual(data["status"], FoodSyncState.Status.RUNNING)
+        self.assertNotIn("shards", data)
+
+
+class FdcTasksViewTests(SimpleTestCase):
+    def trigger_fetch_food_items(self, data, format=None):
+        request = APIRequestFactory().post(
+            "/api/fdc/tasks/", {"task_name": "fetch_food_items", **data}, format=format
+        )
+        with mock.patch("recipes.fdc.views.fetch_food_items.delay") as delay:
+            response = FdcTasksView.as_view()(request)
+        return response, delay
+
+    def test_form_encoded_false_does_not_start_a_full_sync(self):
+        for value in ("false", "0"):
+            response, delay = self.trigger_fetch_food_items({"full": value})
+            self.assertEqual(response.status_code, 200)
+            delay.assert_called_once_with(full=False)
+
+    def test_json_true_starts_a_full_sync(self):
+        response, delay = self.trigger_fetch_food_items({"full": True}, format="json")
+        self.assertEqual(response.status_code, 200)
+        delay.assert_called_once_with(full=True)
@@ -0,0 +1,162 @@
+import email.utils
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from recipes.logging import getLogger
+
+logger = getLogger(__name__)
+
+# 429 is left to the caller: FdcApi raises FdcRateLimited so the shared rate
+# limiter and Celery's countdown retry decide when to call again, instead of a
+# worker sleeping through the backoff here.
+RETRY_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+
+class FdcTransport:
+    """Pooled, keep-alive HTTP session that retries transient failures.
+
+    Retries use full-jitter exponential backoff and honor ``Retry-After`` on
+    503 responses. One instance is shared by every ``FdcApi`` in a process.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float,
+        read_timeout: float,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        pool_size: int,
+    ) -> None:
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=0
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "retries": 0, "failures": 0}
+
+    @classmethod
+    def from_settings(cls) -> "FdcTransport":
+        return cls(
+            connect_timeout=settings.FDC_HTTP_CONNECT_TIMEOUT,
+            read_timeout=settings.FDC_HTTP_READ_TIMEOUT,
+            max_retries=settings.FDC_HTTP_MAX_RETRIES,
+            backoff_base=settings.FDC_HTTP_BACKOFF_BASE,
+            backoff_max=settings.FDC_HTTP_BACKOFF_MAX,
+            pool_size=settings.FDC_HTTP_POOL_SIZE,
+        )
+
+    def _increment(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def retry_after(self, response: requests.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                retry_at = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+        return min(self.backoff_max, max(0.0, delay))
+
+    def request(
+        self, method: str, url: str, max_retries: Optional[int] = None, **kwargs
+    ) -> requests.Response:
+        """Send a request, retrying transient failures up to ``max_retries`` times.
+
+        ``max_retries`` and a ``timeout`` keyword override the transport
+        defaults for calls that must answer quickly.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if max_retries is None:
+            max_retries = self.max_retries
+        attempt = 0
+        while True:
+            self._increment("requests")
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as e:
+                if attempt >= max_retries:
+                    self._increment("failures")
+                    raise
+                delay = self._backoff(attempt)
+                reason = str(e)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                if attempt >= max_retries:
+                    self._increment("failures")
+                    return response
+                retry_after = self.retry_after(response)
+                delay = self._backoff(attempt) if retry_after is None else retry_after
+                reason = f"HTTP {response.status_code}"
+                response.close()
+            attempt += 1
+            self._increment("retries")
+            logger.warning(
+                "Retrying %s %s in %.2fs (attempt %s/%s): %s",
+                method,
+                url,
+                delay,
+                attempt,
+                max_retries,
+                reason,
+            )
+            time.sleep(delay)
+
+    def get_stats(self) -> dict:
+        connections = 0
+        pooled_requests = 0
+        for key in self.adapter.poolmanager.pools.keys():
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            pooled_requests += pool.num_requests
+        with self._lock:
+            stats = dict(self._counters)
+        stats["connections_opened"] = connections
+        stats["connections_reused"] = max(0, pooled_requests - connections)
+        return stats
+
+
+_transport: Optional[FdcTransport] = None
+_transport_pid: Optional[int] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> FdcTransport:
+    """Return this process's shared transport, rebuilding it after a fork."""
+    global _transport, _transport_pid
+    pid = os.getpid()
+    if _transport is None or _transport_pid != pid:
+        with _transport_lock:
+            if _transport is None or _transport_pid != pid:
+                _transport = FdcTransport.from_settings()
+                _transport_pid = pid
+    return _transport
@@ -1,48 +1,253 @@
-from constance import config
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django import forms
+from django.db.models import F, FilteredRelation, Q, TextField
+from django.db.models.functions import Cast, Greatest
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils import timezone
 from django_filters import rest_framework as filters
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework import viewsets
-from rest_framework.filters import SearchFilter
+from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from recipes.config import config
+from recipes.fdc import get_api
 from recipes.fdc.api import FoodDataTypes
-from recipes.fdc.models import FoodItem
-from recipes.fdc.serializers import FoodItemDetailSerializer, FoodItemListSerializer
+from recipes.fdc.circuit import get_circuit_breaker
+from recipes.fdc.models import FoodItem, FoodSyncState
+from recipes.fdc.search import FoodItemSearchFilter, food_item_facets
+from recipes.fdc.serializers import (
+    FoodItemDetailSerializer,
+    FoodItemListSerializer,
+    FoodItemPassthroughSerializer,
+    FoodSyncStateSerializer,
+)
+from recipes.fdc.singleflight import get_detail_single_flight
+from recipes.fdc.sync import claim_food_details, save_food_details
 from recipes.fdc.tasks import (
+    DETAIL_LEASE_DURATION,
+    fetch_food_detail,
     fetch_food_items,
     fetch_missing_food_details,
     fetch_outdated_food_details,
 )
+from recipes.library.pagination import ProxiedKeysetPagination
 from recipes.logging import getLogger
 
 logger = getLogger(__name__)
 
+# Facet counts are recomputed at most this often (in seconds) for the same filters.
+FACETS_CACHE_TIMEOUT = 60
+
+
+class FoodItemFilterForm(forms.Form):
+    def clean(self):
+        cleaned_data = super().clean()
+        ordering = cleaned_data.get("ordering") or []
+        if cleaned_data.get("nutrient") is None and any(
+            field.lstrip("-") == "nutrient_amount" for field in ordering
+        ):
+            self.add_error(
+                "ordering", "Sorting by nutrient_amount requires a nutrient."
+            )
+        return cleaned_data
+
 
 class FoodItemFilter(filters.FilterSet):
+    """Filters food items, optionally by the amount per 100 g of one nutrient.
+
+    ``nutrient`` selects a nutrient by FDC nutrient ID; only foods reporting it
+    are returned, annotated with ``nutrient_amount``, which ``nutrient_min``,
+    ``nutrient_max`` and ``ordering`` can then use.
+    """
+
     ingredient = filters.BooleanFilter(
         field_name="ingredient", lookup_expr="isnull", exclude=True
     )
+    nutrient = filters.NumberFilter(method="filter_nutrient", label="Nutrient ID")
+    nutrient_min = filters.NumberFilter(method="filter_nutrient_amount")
+    nutrient_max = filters.NumberFilter(method="filter_nutrient_amount")
+    ordering = filters.OrderingFilter(
+        fields=["description", "fdc_id", "nutrient_amount"]
+    )
 
     class Meta:
         model = FoodItem
-        fields = ["data_type", "ingredient"]
+        fields = ["data_type", "food_category", "ingredient"]
+        form = FoodItemFilterForm
+
+    def filter_nutrient(self, queryset, name, value):
+        queryset = queryset.annotate(
+            selected_nutrient=FilteredRelation(
+                "nutrients", condition=Q(nutrients__nutrient_id=value)
+            ),
+            nutrient_amount=F("selected_nutrient__amount"),
+        ).filter(nutrient_amount__isnull=False)
+        if self.form.cleaned_data.get("nutrient_min") is not None:
+            queryset = queryset.filter(
+                nutrient_amount__gte=self.form.cleaned_data["nutrient_min"]
+            )
+        if self.form.cleaned_data.get("nutrient_max") is not None:
+            queryset = queryset.filter(
+                nutrient_amount__lte=self.form.cleaned_data["nutrient_max"]
+            )
+        return queryset
+
+    def filter_nutrient_amount(self, queryset, name, value):
+        # Applied by filter_nutrient, which has the nutrient to compare against.
+        return queryset
 
 
 class FoodItemViewSet(viewsets.ModelViewSet):
     queryset = FoodItem.objects.all().order_by("description")
     serializer_class = FoodItemListSerializer
     filterset_class = FoodItemFilter
-    filter_backends = [filters.DjangoFilterBackend, SearchFilter]
-    search_fields = ["description"]
+    filter_backends = [filters.DjangoFilterBackend, FoodItemSearchFilter]
+    pagination_class = ProxiedKeysetPagination
+    keyset_ordering = ["description", "id"]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "retrieve":
+            # Legacy details are read as jsonb text so they can be passed through as is.
+            return (
+                queryset.select_related("detail_record")
+                .defer("legacy_detail")
+                .annotate(legacy_detail_json=Cast("legacy_detail", TextField()))
+            )
+        return queryset.defer("legacy_detail")
 
     def get_serializer(self, *args, **kwargs):
         if self.action == "retrieve":
-            logger.debug(f"Using detail serializer for action: {self.action}")
+            logger.debug("Using detail serializer for action: %s", self.action)
             return FoodItemDetailSerializer(*args, **kwargs)
-        logger.debug(f"Using list serializer for action: {self.action}")
+        logger.debug("Using list serializer for action: %s", self.action)
         return super().get_serializer(*args, **kwargs)
 
+    @action(detail=False)
+    def facets(self, request):
+        """Count the foods matching the current search and filters per facet value.
+
+        Facets are the data type, food category, whether the detail has been
+        fetched and whether an ingredient links to the food. Pagination and
+        ordering parameters are ignored.
+        """
+        ignored = {"limit", "offset", "cursor", "count", "ordering"}
+        params = sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            if name not in ignored
+            for value in values
+        )
+        cache_key = "fdc:facets:" + hashlib.sha256(repr(params).encode()).hexdigest()
+        data = cache.get(cache_key)
+        if data is None:
+            data = food_item_facets(self.filter_queryset(self.get_queryset()))
+            cache.set(cache_key, data, FACETS_CACHE_TIMEOUT)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return a food item, optionally filling in a missing detail first.
+
+        ``?fetch_detail=sync`` fetches a missing detail from FDC within
+        ``FDC_DETAIL_SYNC_TIMEOUT``; concurrent requests for the same food share
+        one upstream call. ``?fetch_detail=async``, or a sync fetch that did not
+        finish in time, queues the fetch and answers 202 Accepted.
+
+        JSON responses splice the stored detail JSON into the body without
+        decoding it, and carry an ETag so unchanged foods answer 304.
+        """
+        fetch_detail = request.query_params.get("fetch_detail")
+        if fetch_detail not in (None, "sync", "async"):
+            return Response(
+                {"error": f"Invalid fetch_detail: {fetch_detail}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        instance = self.get_object()
+        response_status = status.HTTP_200_OK
+        if instance.detail_fetch_date is None and fetch_detail:
+            if fetch_detail == "sync" and self._fetch_detail_now(instance):
+                instance = self.get_object()
+            if instance.detail_fetch_date is None:
+                self._queue_detail_fetch(instance)
+                response_status = status.HTTP_202_ACCEPTED
+        self._record_view(instance.pk)
+        if request.accepted_renderer.format == "json":
+            return self._passthrough_response(request, instance, response_status)
+        return Response(self.get_serializer(instance).data, status=response_status)
+
+    def _passthrough_response(self, request, instance: FoodItem, response_status: int):
+        head = JSONRenderer().render(FoodItemPassthroughSerializer(instance).data)
+        etag = f'"{hashlib.sha256(head).hexdigest()[:32]}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        detail_record = getattr(instance, "detail_record", None)
+        if detail_record is not None:
+            detail_json = detail_record.get_json()
+        elif instance.legacy_detail_json is not None:
+            detail_json = instance.legacy_detail_json.encode()
+        else:
+            detail_json = b"null"
+        response = HttpResponse(
+            b"".join((head[:-1], b',"detail":', detail_json, b"}")),
+            status=response_status,
+            content_type="application/json",
+        )
+        response["ETag"] = etag
+        return response
+
+    def _fetch_detail_now(self, instance: FoodItem) -> bool:
+        """Fetch a missing detail, returning whether it may have been stored."""
+        timeout = settings.FDC_DETAIL_SYNC_TIMEOUT
+        single_flight = get_detail_single_flight(timeout)
+        with single_flight.lead(instance.fdc_id) as leader:
+            if leader:
+                try:
+                    food_detail = get_api(rate_limit_wait=0).get_food_by_fdc_id(
+                        instance.fdc_id, timeout=timeout
+                    )
+                except Exception as e:
+                    logger.warning(
+                        "Could not fetch detail for FDC ID %s: %s", instance.fdc_id, e
+                    )
+                    return False
+                save_food_details([food_detail])
+            elif not single_flight.wait(instance.fdc_id, timeout):
+                logger.info(
+                    "Timed out waiting for detail of FDC ID %s", instance.fdc_id
+                )
+                return False
+        return True
+
+    def _queue_detail_fetch(self, instance: FoodItem) -> None:
+        """Fetch the detail in the background, leasing it so it is queued only once."""
+        claimed = claim_food_details(
+            Q(pk=instance.pk, detail_fetch_date__isnull=True),
+            ["id"],
+            1,
+            DETAIL_LEASE_DURATION,
+        )
+        if claimed:
+            fetch_food_detail.delay(instance.fdc_id)
+            logger.info("Queued detail fetch for FDC ID %s", instance.fdc_id)
+
+    def _record_view(self, pk) -> None:
+        """Move a viewed food item up the detail refresh queue, at most once an hour."""
+        now = timezone.now()
+        FoodItem.objects.filter(pk=pk).exclude(
+            last_viewed_at__gt=now - timezone.timedelta(hours=1)
+        ).update(
+            last_viewed_at=now,
+            detail_priority=Greatest("detail_priority", FoodItem.DetailPriority.VIEWED),
+        )
+
 
 class FdcSettingsView(APIView):
     """API view for managing FDC settings."""
@@ -66,12 +271,12 @@ class FdcSettingsView(APIView):
 
         # Validate and update enabled data types if provided
         if enabled_data_types is not None:
-            logger.debug(f"Validating enabled data types: {enabled_data_types}")
+            logger.debug("Validating enabled data types: %s", enabled_data_types)
             # Validate that all provided data types are valid
             valid_data_types = [dt.value for dt in FoodDataTypes]
             for data_type in enabled_data_types:
                 if data_type not in valid_data_types:
-                    logger.warning(f"Invalid data type provided: {data_type}")
+                    logger.warning("Invalid data type provided: %s", data_type)
                     return Response(
                         {"error": f"Invalid data type: {data_type}"},
                         status=status.HTTP_400_BAD_REQUEST,
@@ -79,7 +284,7 @@ class FdcSettingsView(APIView):
 
             # Update the config
             config.FDC_ENABLED_DATA_TYPES = enabled_data_types
-            logger.info(f"Updated enabled data types to: {enabled_data_types}")
+            logger.info("Updated enabled data types to: %s", enabled_data_types)
 
         # Update API key if provided
         if api_key is not None:
@@ -99,15 +304,29 @@ class FdcSettingsView(APIView):
 class FdcTasksView(APIView):
     """API view for triggering FDC background tasks."""
 
+    def get(self, request):
+        """Get the FDC API circuit breaker state and per-data-type sync progress."""
+        sync_states = FoodSyncState.objects.order_by("data_type")
+        return Response(
+            {
+                "circuit_breaker": get_circuit_breaker().get_state(),
+                "sync": FoodSyncStateSerializer(sync_states, many=True).data,
+            }
+        )
+
     def post(self, request):
         """Trigger an FDC task."""
         task_name = request.data.get("task_name")
-        logger.info(f"Task trigger request received for: {task_name}")
+        logger.info("Task trigger request received for: %s", task_name)
 
         if task_name == "fetch_food_items":
-            logger.info("Queueing fetch_food_items task")
-            task = fetch_food_items.delay()
-            logger.info(f"Task queued successfully with ID: {task.id}")
+            # Form and query string callers send "false"/"0", which bool() reads as true.
+            full = serializers.BooleanField().to_internal_value(
+                request.data.get("full", False)
+            )
+            logger.info("Queueing fetch_food_items task (full=%s)", full)
+            task = fetch_food_items.delay(full=full)
+            logger.info("Task queued successfully with ID: %s", task.id)
             return Response(
                 {
                     "message": "Task 'fetch_food_items' has been queued",
@@ -117,7 +336,7 @@ class FdcTasksView(APIView):
         elif task_name == "fetch_missing_food_details":
             logger.info("Queueing fetch_missing_food_details task")
             task = fetch_missing_food_details.delay()
-            logger.info(f"Task queued successfully with ID: {task.id}")
+            logger.info("Task queued successfully with ID: %s", task.id)
             return Response(
                 {
                     "message": "Task 'fetch_missing_food_details' has been queued",
@@ -127,7 +346,7 @@ class FdcTasksView(APIView):
         elif task_name == "fetch_outdated_food_details":
             logger.info("Queueing fetch_outdated_food_details task")
             task = fetch_outdated_food_details.delay()
-            logger.info(f"Task queued successfully with ID: {task.id}")
+            logger.info("Task queued successfully with ID: %s", task.id)
             return Response(
                 {
                     "message": "Task 'fetch_outdated_food_details' has been queued",
@@ -135,7 +354,7 @@ class FdcTasksView(APIView):
                 }
             )
         else:
-            logger.warning(f"Unknown task requested: {task_name}")
+            logger.warning("Unknown task requested: %s", task_name)
             return Response(
                 {"error": f"Unknown task: {task_name}"},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("library", "0005_remove_recipe_image_url_recipe_image"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["created_at", "id"], name="library_recipe_created_idx"
+            ),
+        ),
+    ]
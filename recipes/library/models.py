@@ -76,6 +76,12 @@ class Recipe(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination order of the recipe list (newest first).
+            models.Index(
+                fields=["created_at", "id"], name="library_recipe_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
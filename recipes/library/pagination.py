@@ -1,12 +1,73 @@
+import base64
+import binascii
+import json
+import re
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset):
+    """Row count of ``queryset`` as estimated by the PostgreSQL planner.
+
+    An unfiltered queryset reads the table's ``pg_class.reltuples``; anything
+    else uses the row estimate of its ``EXPLAIN`` plan. Both are only as fresh
+    as the table's last ANALYZE.
+    """
+    if not queryset.query.where:
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed or analyzed.
+        if row and row[0] >= 0:
+            return int(row[0])
+    # psycopg2 hands Django the decoded plan list, and Django dumps its single
+    # element back out, so the JSON is an object there and a list elsewhere.
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    if isinstance(plan, list):
+        plan = plan[0]
+    return int(plan["Plan"]["Plan Rows"])
 
 
 class ProxiedLimitOffsetPagination(LimitOffsetPagination):
     """
     Pagination class that properly handles proxied requests by using
     X-Original-Host header for building next/previous URLs.
+
+    ``?count=estimate`` replaces the exact ``COUNT(*)`` with the planner's
+    estimate (see ``estimate_count``) and adds ``count_estimated`` to the response.
     """
 
+    count_query_param = "count"
+    count_modes = ("exact", "estimate")
+    default_count_mode = "exact"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param)
+        return mode if mode in self.count_modes else self.default_count_mode
+
+    def get_count(self, queryset):
+        if self.count_mode == "estimate":
+            return estimate_count(queryset)
+        return super().get_count(queryset)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count_mode == "estimate":
+            response.data["count_estimated"] = True
+        return response
+
     def get_next_link(self):
         url = super().get_next_link()
         return self._replace_host_in_url(url)
@@ -31,9 +92,158 @@ class ProxiedLimitOffsetPagination(LimitOffsetPagination):
             if host_to_use:
                 # Replace the host in the URL
                 # URL format: scheme://host/path
-                import re
-
                 # Match the scheme and host portion
                 url = re.sub(r"(https?://)([^/]+)", f"https://{host_to_use}", url)
 
         return url
+
+
+class ProxiedKeysetPagination(ProxiedLimitOffsetPagination):
+    """
+    Limit/offset pagination with an opt-in keyset mode for large tables.
+
+    Sending ``?cursor=`` (empty for the first page) pages on the view's
+    ``keyset_ordering`` instead: each page is a range scan starting after the
+    previous page's last row, so deep pages cost the same as the first one
+    instead of growing with the OFFSET. The next/previous links carry opaque
+    cursors, and keyset mode replaces any other ordering of the queryset.
+    The count defaults to the planner's estimate in this mode; pass
+    ``?count=exact`` for an exact one.
+    """
+
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_ordering = getattr(view, "keyset_ordering", None)
+        if (
+            not self.keyset_ordering
+            or self.cursor_query_param not in request.query_params
+        ):
+            self.keyset = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset = True
+        self.request = request
+        self.count_mode = request.query_params.get(self.count_query_param)
+        if self.count_mode not in self.count_modes:
+            self.count_mode = "estimate"
+        self.limit = self.get_limit(request)
+        cursor = self.decode_cursor(request.query_params[self.cursor_query_param])
+        self.reverse = cursor["reverse"] if cursor else False
+
+        self.count = self.get_count(queryset)
+        ordering = self.keyset_ordering
+        if self.reverse:
+            ordering = [self._invert(field) for field in ordering]
+        page_queryset = queryset.order_by(*ordering)
+        if cursor:
+            page_queryset = page_queryset.filter(
+                self._after(ordering, cursor["position"])
+            )
+        results = list(page_queryset[: self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[: self.limit]
+        if self.reverse:
+            results.reverse()
+
+        position = cursor["position"] if cursor else None
+        if results:
+            first, last = self._position(results[0]), self._position(results[-1])
+        else:
+            first = last = position
+        if self.reverse:
+            self.next_cursor = (
+                self.encode_cursor(last, reverse=False) if cursor else None
+            )
+            self.previous_cursor = (
+                self.encode_cursor(first, reverse=True) if has_more else None
+            )
+        else:
+            self.next_cursor = (
+                self.encode_cursor(last, reverse=False) if has_more else None
+            )
+            self.previous_cursor = (
+                self.encode_cursor(first, reverse=True) if cursor else None
+            )
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "count": self.count,
+                "count_estimated": self.count_mode == "estimate",
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        return self._cursor_link(self.next_cursor)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        return self._cursor_link(self.previous_cursor)
+
+    def _cursor_link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.offset_query_param
+        )
+        url = replace_query_param(url, self.cursor_query_param, cursor)
+        return self._replace_host_in_url(url)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({"p": position, "r": reverse}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, encoded):
+        """Return ``{"position", "reverse"}`` for a cursor, or ``None`` for the first page."""
+        if not encoded:
+            return None
+        try:
+            payload = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            data = json.loads(payload)
+            position, reverse = data["p"], bool(data["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound("Invalid cursor")
+        if not isinstance(position, list) or len(position) != len(self.keyset_ordering):
+            raise NotFound("Invalid cursor")
+        return {"position": position, "reverse": reverse}
+
+    def _position(self, instance):
+        position = []
+        for field in self.keyset_ordering:
+            value = getattr(instance, field.lstrip("-"))
+            position.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return position
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _after(ordering, position):
+        """Match rows strictly after ``position`` in ``ordering``.
+
+        Expands the row comparison ``(a, b) > (x, y)`` as
+        ``a >= x AND (a > x OR (a = x AND b > y))``; the leading ``a >= x``
+        gives the planner an index range to start from.
+        """
+        condition = None
+        for field, value in reversed(list(zip(ordering, position))):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            after = Q(**{f"{name}__{lookup}": value})
+            condition = (
+                after if condition is None else after | (Q(**{name: value}) & condition)
+            )
+        first_field, first_value = ordering[0], position[0]
+        lookup = "lte" if first_field.startswith("-") else "gte"
+        return Q(**{f"{first_field.lstrip('-')}__{lookup}": first_value}) & condition
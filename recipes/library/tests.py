@@ -0,0 +1,21 @@
+import json
+from unittest import mock
+
+from django.db.models import QuerySet
+from django.test import SimpleTestCase
+
+from recipes.library.models import Recipe
+from recipes.library.pagination import estimate_count
+
+PLAN = {"Plan": {"Node Type": "Seq Scan", "Plan Rows": 42}}
+
+
+class EstimateCountTests(SimpleTestCase):
+    def test_filtered_queryset_reads_psycopg2_explain_output(self):
+        # Django re-dumps each plan psycopg2 decoded, so the output is one object.
+        with mock.patch.object(QuerySet, "explain", return_value=json.dumps(PLAN)):
+            self.assertEqual(estimate_count(Recipe.objects.filter(name="Soup")), 42)
+
+    def test_filtered_queryset_reads_plan_list(self):
+        with mock.patch.object(QuerySet, "explain", return_value=json.dumps([PLAN])):
+            self.assertEqual(estimate_count(Recipe.objects.filter(name="Soup")), 42)
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from django.db.models import Q
 
 from recipes.library.models import Ingredient, Recipe, RecipeList
+from recipes.library.pagination import ProxiedKeysetPagination
 from recipes.library.serializers import (
     IngredientSerializer,
     RecipeDetailSerializer,
@@ -32,6 +33,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
     search_fields = ["name", "description", "tags"]
     ordering_fields = ["name", "created_at", "prep_time_minutes", "cook_time_minutes"]
     ordering = ["-created_at"]
+    pagination_class = ProxiedKeysetPagination
+    keyset_ordering = ["-created_at", "-id"]
 
     def create(self, request, *args, **kwargs):
         logger.info("Creating new recipe")
@@ -43,7 +46,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
             try:
                 data["ingredients"] = json.loads(data["ingredients"])
             except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON format for ingredients: {e}")
+                logger.error("Invalid JSON format for ingredients: %s", e)
                 return Response(
                     {"ingredients": f"Invalid JSON format: {str(e)}"},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -54,28 +57,36 @@ class RecipeViewSet(viewsets.ModelViewSet):
             try:
                 data["steps"] = json.loads(data["steps"])
             except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON format for steps: {e}")
+                logger.error("Invalid JSON format for steps: %s", e)
                 return Response(
                     {"steps": f"Invalid JSON format: {str(e)}"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        logger.debug(f"Recipe data parsed - ingredients: {len(data.get('ingredients', []))}, steps: {len(data.get('steps', []))}")
+        logger.debug(
+            "Recipe data parsed - ingredients: %s, steps: %s",
+            len(data.get("ingredients", [])),
+            len(data.get("steps", [])),
+        )
 
         serializer = self.get_serializer(data=data)
         serializer.is_valid(raise_exception=True)
 
-        logger.debug(f"Validated recipe data - ingredients: {len(serializer.validated_data.get('ingredients', []))}, steps: {len(serializer.validated_data.get('steps', []))}")
+        logger.debug(
+            "Validated recipe data - ingredients: %s, steps: %s",
+            len(serializer.validated_data.get("ingredients", [])),
+            len(serializer.validated_data.get("steps", [])),
+        )
 
         self.perform_create(serializer)
-        logger.info(f"Recipe created successfully: {serializer.data.get('name')}")
+        logger.info("Recipe created successfully: %s", serializer.data.get("name"))
         headers = self.get_success_headers(serializer.data)
         return Response(
             serializer.data, status=status.HTTP_201_CREATED, headers=headers
         )
 
     def update(self, request, *args, **kwargs):
-        logger.info(f"Updating recipe with ID: {kwargs.get('pk')}")
+        logger.info("Updating recipe with ID: %s", kwargs.get("pk"))
         # Parse JSON strings from FormData (same as create)
         data = request.data.copy()
 
@@ -84,7 +95,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
             try:
                 data["ingredients"] = json.loads(data["ingredients"])
             except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON format for ingredients: {e}")
+                logger.error("Invalid JSON format for ingredients: %s", e)
                 return Response(
                     {"ingredients": f"Invalid JSON format: {str(e)}"},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -95,7 +106,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
             try:
                 data["steps"] = json.loads(data["steps"])
             except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON format for steps: {e}")
+                logger.error("Invalid JSON format for steps: %s", e)
                 return Response(
                     {"steps": f"Invalid JSON format: {str(e)}"},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -103,7 +114,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         partial = kwargs.pop("partial", False)
         instance = self.get_object()
-        logger.debug(f"Updating recipe '{instance.name}' (partial={partial})")
+        logger.debug("Updating recipe '%s' (partial=%s)", instance.name, partial)
         serializer = self.get_serializer(instance, data=data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
@@ -111,14 +122,14 @@ class RecipeViewSet(viewsets.ModelViewSet):
         if getattr(instance, "_prefetched_objects_cache", None):
             instance._prefetched_objects_cache = {}
 
-        logger.info(f"Recipe updated successfully: {serializer.data.get('name')}")
+        logger.info("Recipe updated successfully: %s", serializer.data.get("name"))
         return Response(serializer.data)
 
     def get_serializer_class(self):
         if self.action in ["list"]:
             logger.debug("Using RecipeListSerializer for list action")
             return RecipeListSerializer
-        logger.debug(f"Using RecipeDetailSerializer for action: {self.action}")
+        logger.debug("Using RecipeDetailSerializer for action: %s", self.action)
         return RecipeDetailSerializer
 
     def get_queryset(self):
@@ -128,7 +139,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         # Filter by difficulty
         difficulty = self.request.query_params.get("difficulty", None)
         if difficulty:
-            logger.debug(f"Filtering by difficulty: {difficulty}")
+            logger.debug("Filtering by difficulty: %s", difficulty)
             queryset = queryset.filter(difficulty=difficulty)
             filters_applied.append(f"difficulty={difficulty}")
 
@@ -136,7 +147,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         tags = self.request.query_params.get("tags", None)
         if tags:
             tag_list = [tag.strip() for tag in tags.split(",")]
-            logger.debug(f"Filtering by tags: {tag_list}")
+            logger.debug("Filtering by tags: %s", tag_list)
             q_objects = Q()
             for tag in tag_list:
                 q_objects |= Q(tags__icontains=tag)
@@ -148,17 +159,17 @@ class RecipeViewSet(viewsets.ModelViewSet):
         if max_time:
             try:
                 max_time_int = int(max_time)
-                logger.debug(f"Filtering by max time: {max_time_int} minutes")
+                logger.debug("Filtering by max time: %s minutes", max_time_int)
                 queryset = queryset.filter(
                     prep_time_minutes__lte=max_time_int,
                     cook_time_minutes__lte=max_time_int,
                 )
                 filters_applied.append(f"max_time<={max_time_int}")
             except ValueError:
-                logger.warning(f"Invalid max_time value provided: {max_time}")
+                logger.warning("Invalid max_time value provided: %s", max_time)
 
         if filters_applied:
-            logger.info(f"Recipe query filters applied: {', '.join(filters_applied)}")
+            logger.info("Recipe query filters applied: %s", ", ".join(filters_applied))
         else:
             logger.debug("No filters applied to recipe query")
 
@@ -1,31 +1,56 @@
-import inspect
+import atexit
+import contextvars
+import copy
+import itertools
+import json
 import logging
-import pathlib
-import traceback
+import logging.config
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
 from logging import Logger
+from logging.handlers import QueueHandler, QueueListener
 
-RELEVANT_ROOT_DIR = "".join(pathlib.Path(__file__).parts[:2])
+# Records are attributed to the innermost frame running code from this package.
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+# Passed as ``extra`` on high-frequency per-item messages so SamplingFilter can thin them.
+SAMPLED = {"sampled": True}
+
+# Set for the duration of a request or Celery task and copied onto every record.
+correlation_id = contextvars.ContextVar("correlation_id", default=None)
+task_id = contextvars.ContextVar("task_id", default=None)
 
 old_factory = logging.getLogRecordFactory()
 
 
+def find_caller_frame(frame):
+    """Return the first frame at or above ``frame`` running this package's code.
+
+    Frames of this module are skipped. Following ``f_back`` costs a few
+    attribute reads per frame, unlike ``inspect.stack()``, which builds every
+    frame's info and reads its source line from disk.
+    """
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PACKAGE_DIR) and filename != __file__:
+            return frame
+        frame = frame.f_back
+    return None
+
+
 def record_factory(*args, **kwargs):
     record = old_factory(*args, **kwargs)
-    try:
-        actual_calling_frame = next(  # pragma: nocover
-            frameinfo
-            for frameinfo in inspect.stack()
-            if frameinfo.filename.startswith(RELEVANT_ROOT_DIR)
-            and frameinfo.filename != __file__
-        )
-    except StopIteration:  # pragma: nocover
-        pass
-    else:
-        record.pathname = actual_calling_frame.filename
-        record.lineno = actual_calling_frame.lineno
-        record.funcName = actual_calling_frame.function
-        record.filename = pathlib.Path(actual_calling_frame.filename).parts[-1]
-        record.module = record.name.split(".")[-1]
+    frame = find_caller_frame(sys._getframe(1))
+    if frame is not None:
+        code = frame.f_code
+        record.pathname = code.co_filename
+        record.lineno = frame.f_lineno
+        record.funcName = code.co_name
+        record.filename = os.path.basename(code.co_filename)
+        record.module = record.name.rpartition(".")[2]
     return record
 
 
@@ -33,50 +58,209 @@ logging.setLogRecordFactory(record_factory)
 
 
 class RecipeLogger:
+    """Logger wrapper whose methods return before any work when their level is disabled.
+
+    Pass arguments separately (``logger.info("Saved %s items", count)``) so
+    the message is only formatted when a handler emits it.
+    """
+
     def __init__(self, logger: Logger):
         self.logger = logger
 
-    def _log_message(self, func, msg, *args, **kwargs):  # pragma: nocover
-        return func(msg, *args, **kwargs)
+    def isEnabledFor(self, level):
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level, msg, *args, **kwargs):
+        if self.logger.isEnabledFor(level):
+            self.logger._log(level, msg, args, **kwargs)
 
     def debug(self, msg, *args, **kwargs):
-        return self.logger.debug(msg, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger._log(logging.DEBUG, msg, args, **kwargs)
 
     def info(self, msg, *args, **kwargs):
-        return self.logger.info(msg, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger._log(logging.INFO, msg, args, **kwargs)
 
     def warning(self, msg, *args, **kwargs):
-        return self.logger.warning(msg, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger._log(logging.WARNING, msg, args, **kwargs)
 
     def error(self, msg, *args, **kwargs):
-        return self.logger.error(msg, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger._log(logging.ERROR, msg, args, **kwargs)
 
     def critical(self, msg, *args, **kwargs):
-        return self.logger.critical(msg, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.CRITICAL):
+            self.logger._log(logging.CRITICAL, msg, args, **kwargs)
 
-    def exception(self, msg, *args, **kwargs):
-        return self.logger.exception(msg, *args, **kwargs)
+    def exception(self, msg, *args, exc_info=True, **kwargs):
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger._log(logging.ERROR, msg, args, exc_info=exc_info, **kwargs)
 
 
-def _filepath_to_dotpath(filepath):  # pragma: nocover
-    project_root = RELEVANT_ROOT_DIR
-    anchor = filepath.rindex(project_root)
-    path = pathlib.Path(filepath[anchor:])
-    parts = path.with_suffix("").parts
-    if parts[-1] == "__init__":
-        parts = parts[:-1]
-    name = ".".join(parts)
-    return name
+def getLogger(name=None):
+    if name is None:
+        name = sys._getframe(1).f_globals.get("__name__")
+    return RecipeLogger(logging.getLogger(name))
 
 
-def getLogger(name=None):  # pragma: nocover
-    if name is None:
-        frames = traceback.extract_stack()
-        for i, frame in enumerate(frames):  # pragma: nocover
-            if frame.filename == __file__:
-                break
-        filepath = frames[i - 1].filename
-        name = _filepath_to_dotpath(filepath)
-
-    logger = RecipeLogger(logging.getLogger(name))
-    return logger
+class CorrelationIdFilter(logging.Filter):
+    """Copy the current request or task correlation ID onto each record."""
+
+    def filter(self, record):
+        record.correlation_id = correlation_id.get()
+        record.task_id = task_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one in ``every`` records logged with ``extra=SAMPLED``, per message.
+
+    Other records always pass. Kept records carry ``sample_every`` so that
+    counts can be scaled back up downstream.
+    """
+
+    def __init__(self, every: int = 1):
+        super().__init__()
+        self.every = max(1, every)
+        self._counters = {}
+
+    def filter(self, record):
+        if self.every == 1 or not getattr(record, "sampled", False):
+            return True
+        counter = self._counters.get(record.msg)
+        if counter is None:
+            counter = self._counters.setdefault(record.msg, itertools.count())
+        if next(counter) % self.every:
+            return False
+        record.sample_every = self.every
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for field in ("correlation_id", "task_id", "sample_every"):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class RecipeQueueHandler(QueueHandler):
+    """Queue handler that keeps a formatted traceback apart from the message.
+
+    The stdlib version folds the traceback into ``msg``, which would put it
+    inside the JSON ``message`` field.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+_queue_lock = threading.Lock()
+# (logger, queue handler, listener) for every logger whose handlers were moved behind a queue.
+_queued_loggers = []
+
+
+def start_queue_logging(names) -> None:
+    """Move the handlers of the named loggers (``""`` is the root) behind a queue.
+
+    Log calls then only enqueue the record, and a listener thread per logger
+    does the formatting and I/O. The wrapped handlers' filters move onto the
+    queue handler so they still run in the logging thread, where the
+    correlation ID context is set.
+    """
+    with _queue_lock:
+        _stop_listeners()
+        for name in names:
+            logger = logging.getLogger(name or None)
+            handlers = [
+                handler
+                for handler in logger.handlers
+                if not isinstance(handler, QueueHandler)
+            ]
+            if not handlers:
+                continue
+            queue_handler = RecipeQueueHandler(queue.SimpleQueue())
+            for handler in handlers:
+                for log_filter in handler.filters:
+                    if log_filter not in queue_handler.filters:
+                        queue_handler.addFilter(log_filter)
+                handler.filters = []
+            listener = QueueListener(
+                queue_handler.queue, *handlers, respect_handler_level=True
+            )
+            logger.handlers = [queue_handler]
+            listener.start()
+            _queued_loggers.append((logger, queue_handler, listener))
+
+
+def _stop_listeners() -> None:
+    while _queued_loggers:
+        _, _, listener = _queued_loggers.pop()
+        listener.stop()
+
+
+def stop_queue_logging() -> None:
+    """Write out every queued record and stop the listener threads."""
+    with _queue_lock:
+        for logger, queue_handler, listener in _queued_loggers:
+            listener.stop()
+            logger.handlers = list(listener.handlers)
+            for log_filter in queue_handler.filters:
+                for handler in listener.handlers:
+                    handler.addFilter(log_filter)
+        _queued_loggers.clear()
+
+
+def _restart_queue_logging_after_fork() -> None:
+    # Listener threads do not survive a fork, and the parent's queues may be
+    # mid-operation; give the child fresh ones.
+    global _queue_lock
+    _queue_lock = threading.Lock()
+    for _, queue_handler, listener in _queued_loggers:
+        queue_handler.queue = listener.queue = queue.SimpleQueue()
+        listener._thread = None
+        listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_queue_logging_after_fork)
+atexit.register(stop_queue_logging)
+
+
+def configure_logging(logging_settings) -> None:
+    """``LOGGING_CONFIG`` callable: apply ``LOGGING``, then queue handlers if enabled."""
+    from django.conf import settings
+
+    logging.config.dictConfig(logging_settings)
+    if settings.LOG_QUEUE:
+        start_queue_logging({"", *logging_settings.get("loggers", {})})
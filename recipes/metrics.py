@@ -0,0 +1,238 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from recipes.logging import getLogger
+from recipes.redis_client import get_redis
+
+logger = getLogger(__name__)
+
+KEY_PREFIX = "metrics:"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TASK_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# name -> metric, in definition order, for the exposition.
+REGISTRY = {}
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY[name] = self
+
+    @property
+    def key(self) -> str:
+        return f"{KEY_PREFIX}{self.name}"
+
+    def _labels(self, labels: dict) -> str:
+        return json.dumps([str(labels.get(name, "")) for name in self.labelnames])
+
+    def samples(self, stored: dict[str, float]):
+        """Yield ``(name suffix, labels, value)`` from this metric's stored fields."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        _buffer.add(self.key, self._labels(labels), amount)
+
+    def samples(self, stored):
+        for field, value in sorted(stored.items()):
+            yield "_total", json.loads(field), value
+
+
+class Histogram(Metric):
+    """Histogram with cumulative buckets, as Prometheus expects them."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        prefix = self._labels(labels)
+        # Only the first bucket holding the value is stored; the exposition sums them up.
+        index = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound),
+            len(self.buckets),
+        )
+        _buffer.add(self.key, f"{prefix}|b{index}", 1)
+        _buffer.add(self.key, f"{prefix}|sum", value)
+        _buffer.add(self.key, f"{prefix}|count", 1)
+
+    def time(self, **labels) -> "Timer":
+        return Timer(self, labels)
+
+    def samples(self, stored):
+        series = defaultdict(dict)
+        for field, value in stored.items():
+            prefix, _, part = field.rpartition("|")
+            series[prefix][part] = value
+        for prefix, parts in sorted(series.items()):
+            labels = json.loads(prefix)
+            cumulative = 0
+            for index, bound in enumerate(self.buckets + (math.inf,)):
+                cumulative += parts.get(f"b{index}", 0)
+                yield "_bucket", labels + [_format_bound(bound)], cumulative
+            yield "_sum", labels, parts.get("sum", 0)
+            yield "_count", labels, parts.get("count", 0)
+
+
+class Timer:
+    """Context manager observing the elapsed time of its block.
+
+    Labels can still be changed inside the block, e.g. to record an outcome.
+    """
+
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+
+class MetricsBuffer:
+    """Per-process increments, added to the shared Redis hashes in batches.
+
+    Recording a value only touches a dict; a daemon thread writes the batch
+    with one pipeline every ``METRICS_FLUSH_INTERVAL`` seconds, so every
+    gunicorn worker and Celery pool process adds into the same totals. A
+    forked child starts with an empty buffer and its own thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(lambda: defaultdict(float))
+        self._pid = None
+
+    def add(self, key: str, field: str, amount: float) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+            self._pending[key][field] += amount
+
+    def _start(self) -> None:
+        self._pid = os.getpid()
+        self._pending.clear()
+        threading.Thread(target=self._run, name="metrics-flush", daemon=True).start()
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending or self._pid != os.getpid():
+                return
+            pending = self._pending
+            self._pending = defaultdict(lambda: defaultdict(float))
+        try:
+            pipeline = get_redis().pipeline(transaction=False)
+            for key, fields in pending.items():
+                for field, amount in fields.items():
+                    pipeline.hincrbyfloat(key, field, amount)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(
+                "Could not flush metrics, dropping %s metrics: %s", len(pending), e
+            )
+
+    def reset_after_fork(self) -> None:
+        # The flush thread may have held the lock at the fork.
+        self._lock = threading.Lock()
+
+
+_buffer = MetricsBuffer()
+flush_metrics = _buffer.flush
+os.register_at_fork(after_in_child=_buffer.reset_after_fork)
+atexit.register(flush_metrics)
+
+
+def render_metrics() -> str:
+    """Read every metric from Redis and format it in the Prometheus text format."""
+    pipeline = get_redis().pipeline(transaction=False)
+    for metric in REGISTRY.values():
+        pipeline.hgetall(metric.key)
+    lines = []
+    for metric, stored in zip(REGISTRY.values(), pipeline.execute()):
+        # In the 0.0.4 text format a counter's family is named like its samples.
+        family = f"{metric.name}_total" if metric.kind == "counter" else metric.name
+        lines.append(f"# HELP {family} {metric.documentation}")
+        lines.append(f"# TYPE {family} {metric.kind}")
+        stored = {field.decode(): float(value) for field, value in stored.items()}
+        labelnames = metric.labelnames
+        for suffix, labels, value in metric.samples(stored):
+            value = float(value)
+            names = labelnames + ("le",) if suffix == "_bucket" else labelnames
+            label_text = ",".join(
+                f'{name}="{_escape(label)}"' for name, label in zip(names, labels)
+            )
+            series = f"{metric.name}{suffix}"
+            if label_text:
+                series += f"{{{label_text}}}"
+            lines.append(f"{series} {int(value) if value.is_integer() else value!r}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+http_request_duration = Histogram(
+    "recipes_http_request_duration_seconds",
+    "Time spent handling an HTTP request, by view and DRF action.",
+    ("view", "action", "method", "status"),
+)
+fdc_requests = Counter(
+    "recipes_fdc_requests",
+    "FDC API calls made by FdcApi.get, by endpoint and outcome.",
+    ("endpoint", "outcome"),
+)
+fdc_request_duration = Histogram(
+    "recipes_fdc_request_duration_seconds",
+    "Time spent in FdcApi.get, including rate limiting and retries.",
+    ("endpoint", "outcome"),
+)
+fdc_items_synced = Counter(
+    "recipes_fdc_items_synced",
+    "Food items written by list syncs and detail fetches.",
+    ("kind", "outcome"),
+)
+task_runs = Counter(
+    "recipes_task_runs",
+    "Celery task runs, by task and final state.",
+    ("task", "state"),
+)
+task_duration = Histogram(
+    "recipes_task_duration_seconds",
+    "Celery task run time, by task and final state.",
+    ("task", "state"),
+    buckets=TASK_BUCKETS,
+)
@@ -0,0 +1,73 @@
+import re
+import time
+import uuid
+
+from recipes.logging import correlation_id
+from recipes.metrics import http_request_duration
+
+# Incoming IDs are echoed into logs and headers, so only accept plain tokens.
+REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+class CorrelationIdMiddleware:
+    """Tag every log record of a request with its ``X-Request-ID``.
+
+    An ID set by the proxy is reused, otherwise a new one is generated. It is
+    returned in the response's ``X-Request-ID`` header and passed on to Celery
+    tasks queued while handling the request.
+    """
+
+    header = "HTTP_X_REQUEST_ID"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.META.get(self.header, "")
+        if not REQUEST_ID_RE.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.correlation_id = request_id
+        token = correlation_id.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            correlation_id.reset(token)
+        response["X-Request-ID"] = request_id
+        return response
+
+
+class MetricsMiddleware:
+    """Time every request by the view and DRF action that handled it.
+
+    Viewsets are labelled with their class and action (``list``, ``retrieve``,
+    ``facets``, ...), other views with their class or function name. Requests
+    that matched no URL share the ``unmatched`` view label.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        request.metrics_view = ("unmatched", "")
+        response = self.get_response(request)
+        view, action = request.metrics_view
+        http_request_duration.observe(
+            time.perf_counter() - started,
+            view=view,
+            action=action,
+            method=request.method,
+            status=response.status_code,
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # DRF views carry their class as ``cls``, Django class-based views as ``view_class``.
+        view_class = getattr(view_func, "cls", None)
+        if view_class is None:
+            view_class = getattr(view_func, "view_class", None)
+        actions = getattr(view_func, "actions", None) or {}
+        request.metrics_view = (
+            view_class.__name__ if view_class else view_func.__name__,
+            actions.get(request.method.lower(), ""),
+        )
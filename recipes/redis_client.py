@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis() -> redis.Redis:
+    """Shared Redis client for cross-process coordination (rate limits, locks).
+
+    redis-py connection pools reconnect after a fork, so one client per
+    process is safe for Celery prefork workers.
+    """
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
@@ -24,9 +24,9 @@ USE_X_FORWARDED_HOST = True
 # Log startup configuration
 import logging
 startup_logger = logging.getLogger(__name__)
-startup_logger.info(f"Django starting with DEBUG={DEBUG}")
-startup_logger.info(f"Allowed hosts: {ALLOWED_HOSTS}")
-startup_logger.info(f"CSRF trusted origins: {CSRF_TRUSTED_ORIGINS}")
+startup_logger.info("Django starting with DEBUG=%s", DEBUG)
+startup_logger.info("Allowed hosts: %s", ALLOWED_HOSTS)
+startup_logger.info("CSRF trusted origins: %s", CSRF_TRUSTED_ORIGINS)
 
 
 # Application definition
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "constance",
     "django_filters",
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "recipes.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -55,6 +57,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "recipes.middleware.CorrelationIdMiddleware",
 ]
 
 # Proxy configuration for nginx
@@ -95,7 +98,12 @@ DATABASES = {
     }
 }
 
-startup_logger.info(f"Database configured: {DATABASES['default']['ENGINE']} at {DATABASES['default']['HOST']}:{DATABASES['default']['PORT']}")
+startup_logger.info(
+    "Database configured: %s at %s:%s",
+    DATABASES["default"]["ENGINE"],
+    DATABASES["default"]["HOST"],
+    DATABASES["default"]["PORT"],
+)
 
 
 # Password validation
@@ -147,7 +155,11 @@ SENTRY_DSN = os.getenv("DJANGO_SENTRY_DSN")
 if SENTRY_DSN:
     sentry_environment = os.getenv("DJANGO_SENTRY_ENV", "dev")
     sentry_release = os.getenv("DJANGO_SENTRY_RELEASE_VERSION", "dev")
-    startup_logger.info(f"Initializing Sentry with environment: {sentry_environment}, release: {sentry_release}")
+    startup_logger.info(
+        "Initializing Sentry with environment: %s, release: %s",
+        sentry_environment,
+        sentry_release,
+    )
     sentry_sdk.init(
         dsn=SENTRY_DSN,
         traces_sample_rate=0.1,
@@ -166,15 +178,60 @@ else:
 CELERY_RESULT_BACKEND = "django-db"
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+# Detail fetches for foods a user is viewing get their own queue, with its own
+# worker, so they never wait behind the long-running sync and drain tasks.
+FDC_INTERACTIVE_QUEUE = os.getenv("FDC_INTERACTIVE_QUEUE", "fdc-interactive")
+CELERY_TASK_ROUTES = {
+    "recipes.fdc.tasks.fetch_food_detail": {"queue": FDC_INTERACTIVE_QUEUE},
+}
+
+# Redis used for state shared between web and worker processes
+REDIS_URL = os.getenv("REDIS_URL", CELERY_BROKER_URL)
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2"))
+
+# Django cache; a redis:// URL shares it between processes, "locmem://" keeps it
+# in each process (Constance then reads its database directly).
+CACHE_URL = os.getenv("CACHE_URL", REDIS_URL)
+if CACHE_URL.startswith(("redis://", "rediss://", "unix://")):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+            "KEY_PREFIX": "recipes",
+            "OPTIONS": {
+                "socket_timeout": REDIS_SOCKET_TIMEOUT,
+                "socket_connect_timeout": REDIS_SOCKET_TIMEOUT,
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "KEY_PREFIX": "recipes",
+        }
+    }
+
+# Request, FDC client and task metrics, summed in Redis across all web and worker
+# processes and served at /api/metrics. Each process writes its increments in one
+# batch per flush interval. Set METRICS_TOKEN to require "Authorization: Bearer".
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower()[:1] == "t"
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
 
-startup_logger.info(f"Celery broker configured: {CELERY_BROKER_URL}")
-startup_logger.info(f"Celery result backend: {CELERY_RESULT_BACKEND}")
+startup_logger.info("Celery broker configured: %s", CELERY_BROKER_URL)
+startup_logger.info("Celery result backend: %s", CELERY_RESULT_BACKEND)
 
 CELERY_BEAT_SCHEDULE = {
     "fetch_food_items": {
         "task": "recipes.fdc.tasks.fetch_food_items",
         "schedule": crontab(minute="0", hour="0"),  # Every day at 12 AM
     },
+    "fetch_food_items_full": {
+        "task": "recipes.fdc.tasks.fetch_food_items",
+        "schedule": crontab(minute="0", hour="3", day_of_week="sun"),  # Sundays at 3 AM
+        "kwargs": {"full": True},
+    },
     "fetch_missing_food_details": {
         "task": "recipes.fdc.tasks.fetch_missing_food_details",
         "schedule": crontab(minute="0", hour="1"),  # Every day at 1 AM
@@ -188,6 +245,12 @@ CELERY_BEAT_SCHEDULE = {
 
 # Constance
 CONSTANCE_BACKEND = "constance.backends.database.DatabaseBackend"
+if CACHES["default"]["BACKEND"].endswith("RedisCache"):
+    CONSTANCE_DATABASE_CACHE_BACKEND = "default"
+# recipes.config keeps a per-process snapshot of these values for hot paths. It
+# is reloaded after the TTL, or within the check interval once a change is saved.
+CONFIG_SNAPSHOT_TTL = float(os.getenv("CONFIG_SNAPSHOT_TTL", "60"))
+CONFIG_VERSION_CHECK_INTERVAL = float(os.getenv("CONFIG_VERSION_CHECK_INTERVAL", "2"))
 CONSTANCE_CONFIG = {
     "FDC_API_KEY": ("DEMO_KEY", "API key for the FoodData Central API.", str),
     "FDC_DETAIL_EXPIRY_DAYS": (
@@ -202,9 +265,58 @@ CONSTANCE_CONFIG = {
         "List of FoodData Central data types to fetch.",
         list,
     ),
+    "FDC_SYNC_PREFETCH_PAGES": (
+        4,
+        "Number of food list pages fetched concurrently ahead of the database "
+        "writer during a sync. 0 or 1 fetches pages one at a time.",
+        int,
+    ),
+    "FDC_SYNC_SHARD_PAGES": (
+        50,
+        "Number of food list pages per shard when a full sync is fanned out "
+        "across workers.",
+        int,
+    ),
+    "FDC_DETAIL_WORKERS": (
+        4,
+        "Number of tasks that refresh food details in parallel, each claiming "
+        "its own batches from the queue.",
+        int,
+    ),
+    "FDC_RATE_LIMIT_PER_HOUR": (
+        1000,
+        "Maximum FDC API requests per hour shared by all workers using the API key.",
+        int,
+    ),
 }
 
+# FoodData Central HTTP client
+FDC_HTTP_CONNECT_TIMEOUT = float(os.getenv("FDC_HTTP_CONNECT_TIMEOUT", "5"))
+FDC_HTTP_READ_TIMEOUT = float(os.getenv("FDC_HTTP_READ_TIMEOUT", "30"))
+FDC_HTTP_MAX_RETRIES = int(os.getenv("FDC_HTTP_MAX_RETRIES", "5"))
+FDC_HTTP_BACKOFF_BASE = float(os.getenv("FDC_HTTP_BACKOFF_BASE", "0.5"))
+FDC_HTTP_BACKOFF_MAX = float(os.getenv("FDC_HTTP_BACKOFF_MAX", "60"))
+FDC_HTTP_POOL_SIZE = int(os.getenv("FDC_HTTP_POOL_SIZE", "10"))
+FDC_DETAIL_SYNC_TIMEOUT = float(os.getenv("FDC_DETAIL_SYNC_TIMEOUT", "3"))
+FDC_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("FDC_CIRCUIT_FAILURE_THRESHOLD", "5"))
+FDC_CIRCUIT_RESET_TIMEOUT = float(os.getenv("FDC_CIRCUIT_RESET_TIMEOUT", "300"))
+
+# Optional on-disk FDC response cache; set FDC_CACHE_DIR to enable it. A TTL or
+# size of 0 means unlimited. Offline mode replays the cache and never calls FDC.
+FDC_CACHE_DIR = os.getenv("FDC_CACHE_DIR", "")
+FDC_CACHE_TTL = float(os.getenv("FDC_CACHE_TTL", str(7 * 24 * 3600)))
+FDC_CACHE_MAX_BYTES = int(os.getenv("FDC_CACHE_MAX_BYTES", str(1024**3)))
+FDC_CACHE_OFFLINE = os.getenv("FDC_CACHE_OFFLINE", "False").lower()[:1] == "t"
+
 # Logging Configuration
+# "json" writes one JSON object per record with the request/task correlation ID.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Hand records to a background thread so log calls never wait on stdout.
+LOG_QUEUE = os.getenv("LOG_QUEUE", str(LOG_FORMAT == "json")).lower()[:1] == "t"
+# Keep one in N of the high-frequency per-item messages (logged with extra=SAMPLED).
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "1"))
+
+LOGGING_CONFIG = "recipes.logging.configure_logging"
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -216,12 +328,18 @@ LOGGING = {
                 "[%(levelname)s] %(message)s"
             ),
         },
+        "json": {"()": "recipes.logging.JsonFormatter"},
+    },
+    "filters": {
+        "correlation": {"()": "recipes.logging.CorrelationIdFilter"},
+        "sampling": {"()": "recipes.logging.SamplingFilter", "every": LOG_SAMPLE_EVERY},
     },
     "handlers": {
         "console": {
             "level": "INFO",
             "class": "logging.StreamHandler",
-            "formatter": "console",
+            "formatter": "json" if LOG_FORMAT == "json" else "console",
+            "filters": ["correlation", "sampling"],
             "stream": "ext://sys.stdout",
         },
     },
@@ -6,6 +6,7 @@ from rest_framework import routers
 
 from recipes.fdc.views import FoodItemViewSet, FdcSettingsView, FdcTasksView
 from recipes.library.views import IngredientViewSet, RecipeListViewSet, RecipeViewSet
+from recipes.views import metrics
 
 router = routers.DefaultRouter()
 router.register(r"fdc/food-items", FoodItemViewSet)
@@ -18,6 +19,7 @@ urlpatterns = [
     path("api/", include(router.urls)),
     path("api/fdc/settings/", FdcSettingsView.as_view(), name="fdc-settings"),
     path("api/fdc/tasks/", FdcTasksView.as_view(), name="fdc-tasks"),
+    path("api/metrics", metrics, name="metrics"),
 ]
 
 if settings.DEBUG:
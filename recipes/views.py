@@ -0,0 +1,27 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from recipes.logging import getLogger
+from recipes.metrics import render_metrics
+
+logger = getLogger(__name__)
+
+
+@require_GET
+def metrics(request):
+    """Prometheus scrape endpoint for the metrics of every process."""
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+            return HttpResponse(status=401)
+    try:
+        body = render_metrics()
+    except Exception as e:
+        logger.error("Could not read metrics: %s", e)
+        return HttpResponse(
+            "Metrics unavailable\n", status=503, content_type="text/plain"
+        )
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")